@@ -1,17 +1,31 @@
 import os
+import asyncio
 import hmac
 import hashlib
-import jwt
 import time
+import httpx
 from datetime import datetime
-from fastapi import FastAPI, Request, HTTPException, Header
-from fastapi.responses import HTMLResponse
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import FastAPI, Request, HTTPException, Header, Query, WebSocket
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from typing import Optional, List, Dict
-from github import Github, GithubIntegration
+from typing import Optional
 from dotenv import load_dotenv
 
+from github_auth import AppJWTProvider, InstallationTokenCache, parse_github_timestamp
+from circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from github_client import COMMENTS, TOKEN_EXCHANGE, GitHubClient
+from issue_store import ISSUE_FIELDS, IssueFilter, IssueRecord, create_issue_store, decode_cursor, encode_cursor
+from journal import WebhookJournal
+from json_backend import dumps
+from live_updates import Broadcast, PushHub, sse_event
+from rate_limiter import RateLimitExceeded, RateLimitScheduler
+from retry import RetryBudget, RetryPolicy
+from response_cache import ENCODINGS, ResponseCache, preferred_encoding
+from webhook_events import EventRouter, IssueOpenedEvent, decode_issues_event, parse_routes
+from work_queue import WebhookQueue
+
 # Load environment variables
 load_dotenv()
 
@@ -21,14 +35,71 @@ app = FastAPI(title="GitHub Issue Commenter Bot")
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# In-memory storage for issues (in production, use a database)
-recent_issues: List[Dict] = []
-MAX_STORED_ISSUES = 100
+# Dashboard storage: an in-memory ring buffer, or a persistent SQLite history
+ISSUE_STORE_BACKEND = os.getenv("ISSUE_STORE_BACKEND", "memory")
+ISSUE_STORE_PATH = os.getenv("ISSUE_STORE_PATH", "issues.db")
+# Issues kept in memory by the ring buffer backend
+MAX_STORED_ISSUES = int(os.getenv("MAX_STORED_ISSUES", "1000"))
+# Default and maximum page sizes of /api/issues
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+issue_store = create_issue_store(ISSUE_STORE_BACKEND, MAX_STORED_ISSUES, ISSUE_STORE_PATH)
+# Encoded /api/issues responses kept per distinct query until the next stored issue (0 disables)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "128"))
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE)
+
+# Live updates pushed to dashboards over /api/issues/stream; idle streams get a keepalive this often
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+issue_stream = Broadcast()
+# ... and over /ws/issues, with a bounded send buffer per socket; sockets that accept
+# nothing for WEBSOCKET_SEND_TIMEOUT seconds are disconnected
+WEBSOCKET_BUFFER_SIZE = int(os.getenv("WEBSOCKET_BUFFER_SIZE", "64"))
+WEBSOCKET_SEND_TIMEOUT = float(os.getenv("WEBSOCKET_SEND_TIMEOUT", "10"))
+issue_sockets = PushHub(buffer_size=WEBSOCKET_BUFFER_SIZE)
 
 # GitHub App Configuration
 APP_ID = os.getenv("GITHUB_APP_ID")
 PRIVATE_KEY = os.getenv("GITHUB_PRIVATE_KEY", "").replace("\\n", "\n")
 WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+# Keep-alive connection pool shared by every GitHub call; HTTP/2 needs the h2 package
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "100"))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+GITHUB_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "30"))
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "false").lower() == "true"
+# Per-installation pacing of GitHub calls (GitHub's secondary limit allows ~80 content-creating
+# requests per minute, 0 disables pacing); rate-limited calls wait up to GITHUB_RATE_LIMIT_MAX_WAIT
+# seconds to be retried
+GITHUB_RATE_LIMIT_PER_MINUTE = float(os.getenv("GITHUB_RATE_LIMIT_PER_MINUTE", "80"))
+GITHUB_RATE_LIMIT_BURST = int(os.getenv("GITHUB_RATE_LIMIT_BURST", "20"))
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "300"))
+# A synchronous /webhook waits at most this long for a rate-limit slot (GitHub gives up on a
+# delivery after 10 seconds); a longer wait defers the comment to the worker pool
+WEBHOOK_SYNC_MAX_WAIT = float(os.getenv("WEBHOOK_SYNC_MAX_WAIT", "5"))
+# Connection errors and 5xx responses are retried with jittered exponential backoff; retries are
+# capped at GITHUB_RETRY_BUDGET times the request rate so an outage does not multiply the load
+GITHUB_RETRY_ATTEMPTS = int(os.getenv("GITHUB_RETRY_ATTEMPTS", "4"))
+GITHUB_RETRY_BASE_DELAY = float(os.getenv("GITHUB_RETRY_BASE_DELAY", "0.5"))
+GITHUB_RETRY_MAX_DELAY = float(os.getenv("GITHUB_RETRY_MAX_DELAY", "8"))
+GITHUB_RETRY_BUDGET = float(os.getenv("GITHUB_RETRY_BUDGET", "0.2"))
+# Token exchanges and comments each stop calling GitHub for GITHUB_BREAKER_RESET_SECONDS after
+# GITHUB_BREAKER_FAILURES consecutive failures, then let a single probe request through
+GITHUB_BREAKER_FAILURES = int(os.getenv("GITHUB_BREAKER_FAILURES", "5"))
+GITHUB_BREAKER_RESET_SECONDS = float(os.getenv("GITHUB_BREAKER_RESET_SECONDS", "30"))
+
+# Installation tokens live for an hour; start refreshing this many seconds before expiry
+TOKEN_REFRESH_AHEAD = int(os.getenv("GITHUB_TOKEN_REFRESH_AHEAD", "300"))
+
+# Return 202 right after signature verification and process events from an in-process queue
+WEBHOOK_ASYNC_PROCESSING = os.getenv("WEBHOOK_ASYNC_PROCESSING", "false").lower() == "true"
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+
+# Webhook routing table: comma-separated `event:action` (or bare `event` for every action)
+WEBHOOK_EVENTS = os.getenv("WEBHOOK_EVENTS", "issues:opened")
+
+# Optional SQLite journal: accepted events are persisted before acknowledging and replayed after a restart
+WEBHOOK_JOURNAL_PATH = os.getenv("WEBHOOK_JOURNAL_PATH")
 
 # PR Guidelines template
 PR_GUIDELINES = """
@@ -79,22 +150,95 @@ def verify_signature(payload_body: bytes, signature_header: str) -> bool:
     return hmac.compare_digest(expected_signature, signature_header)
 
 
+# The private key is parsed once here; JWTs are minted for ~9 minutes and reused
+jwt_provider = AppJWTProvider(APP_ID, PRIVATE_KEY)
+
+
 def get_jwt_token() -> str:
-    """Generate a JWT token for GitHub App authentication."""
-    payload = {
-        'iat': int(time.time()),
-        'exp': int(time.time()) + (10 * 60),  # JWT expires in 10 minutes
-        'iss': APP_ID
+    """Get a JWT token for GitHub App authentication."""
+    return jwt_provider.get()
+
+
+# Shared async GitHub client; requests never block the event loop
+github = GitHubClient(
+    GITHUB_API_URL,
+    max_connections=GITHUB_MAX_CONNECTIONS,
+    max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY,
+    http2=GITHUB_HTTP2,
+    scheduler=RateLimitScheduler(
+        rate=GITHUB_RATE_LIMIT_PER_MINUTE / 60,
+        burst=GITHUB_RATE_LIMIT_BURST,
+        max_wait=GITHUB_RATE_LIMIT_MAX_WAIT
+    ),
+    retry=RetryPolicy(
+        attempts=GITHUB_RETRY_ATTEMPTS,
+        base_delay=GITHUB_RETRY_BASE_DELAY,
+        max_delay=GITHUB_RETRY_MAX_DELAY,
+        budget=RetryBudget(ratio=GITHUB_RETRY_BUDGET)
+    ),
+    breakers={
+        endpoint: CircuitBreaker(
+            endpoint,
+            failure_threshold=GITHUB_BREAKER_FAILURES,
+            reset_timeout=GITHUB_BREAKER_RESET_SECONDS
+        )
+        for endpoint in (TOKEN_EXCHANGE, COMMENTS)
     }
-    return jwt.encode(payload, PRIVATE_KEY, algorithm='RS256')
+)
+
+
+async def fetch_installation_token(installation_id: int):
+    """Exchange the app JWT for a new installation access token."""
+    auth = await github.create_installation_token(installation_id, get_jwt_token())
+    return auth["token"], parse_github_timestamp(auth["expires_at"])
+
 
+token_cache = InstallationTokenCache(fetch_installation_token, refresh_ahead=TOKEN_REFRESH_AHEAD)
 
-def get_installation_access_token(installation_id: int) -> str:
-    """Get an installation access token for the GitHub App."""
-    jwt_token = get_jwt_token()
-    integration = GithubIntegration(APP_ID, PRIVATE_KEY)
-    auth = integration.get_access_token(installation_id)
-    return auth.token
+
+async def get_installation_access_token(installation_id: int) -> str:
+    """Get an installation access token for the GitHub App (cached per installation)."""
+    return await token_cache.get(installation_id)
+
+
+@app.on_event("startup")
+async def start_webhook_queue():
+    """Start the webhook worker pool and replay journaled events that were never processed."""
+    issue_stream.start_heartbeat(b": keepalive\n\n", STREAM_HEARTBEAT_SECONDS)
+    issue_sockets.start_ticker("stats", stats_message, STREAM_HEARTBEAT_SECONDS)
+    
+    pending = []
+    if journal is not None:
+        await journal.open()
+        await journal.compact()
+        pending = await journal.pending_events()
+    
+    if WEBHOOK_ASYNC_PROCESSING or pending:
+        await webhook_queue.start()
+    
+    if pending:
+        print(f"Replaying {len(pending)} journaled webhook events")
+        for journal_id, _event, payload_body in pending:
+            _action, event = decode_issues_event(payload_body)
+            if event is None:
+                journal.mark_done(journal_id)
+                continue
+            # The crash may have come after the issue was stored or the comment posted
+            recorded = issue_store.has_issue(event.full_name, event.number)
+            await webhook_queue.put((journal_id, event, recorded, True))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """End live streams, drain queued webhooks, then release the journal, issue store and pooled GitHub connections."""
+    issue_stream.close()
+    issue_sockets.close()
+    await webhook_queue.stop()
+    if journal is not None:
+        await journal.close()
+    issue_store.close()
+    await github.aclose()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -102,26 +246,429 @@ async def root(request: Request):
     """Dashboard - shows all recent issues."""
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
-        "total_issues": len(recent_issues),
+        "total_issues": len(issue_store),
         "app_name": "GitHub Issue Commenter Bot"
     })
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint for monitoring."""
-    return {"status": "healthy"}
+    """Health check endpoint for monitoring; `degraded` while a GitHub circuit breaker is not closed."""
+    breakers = {name: breaker.stats() for name, breaker in github.breakers.items()}
+    degraded = any(stats["state"] != CLOSED for stats in breakers.values())
+    return {"status": "degraded" if degraded else "healthy", "github": breakers}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Internal counters for performance monitoring."""
+    return {
+        "installation_tokens": token_cache.stats(),
+        "github_client": github.stats(),
+        "github_rate_limits": github.scheduler.stats() if github.scheduler else None,
+        "github_retries": github.retry.stats() if github.retry else None,
+        "app_jwt": jwt_provider.stats(),
+        "webhook_queue": webhook_queue.stats(),
+        "journal": journal.stats() if journal else None,
+        "webhook_routing": event_router.stats(),
+        "issue_stream": issue_stream.stats(),
+        "issue_sockets": issue_sockets.stats(),
+        "response_cache": response_cache.stats()
+    }
+
+
+def cache_headers(request: Request) -> dict:
+    """Validators for an issue listing: the store version plus the query that shaped the response."""
+    digest = hashlib.sha1(request.url.query.encode("utf-8")).hexdigest()[:16]
+    headers = {"ETag": f'"{issue_store.version}-{digest}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    last_modified = issue_store.last_modified
+    # Last-Modified has one-second resolution and could not tell apart two issues stored within
+    # the same second, so it is only sent once the latest issue is a full second old
+    if last_modified is not None and time.time() - last_modified >= 1:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong validator of a compressed variant: each content coding gets its own tag."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def not_modified(request: Request, headers: dict) -> bool:
+    """Evaluate If-None-Match (or, without it, If-Modified-Since) against the current validators.
+    
+    A match on a compressed variant's tag sets that tag as the ETag of the 304.
+    If-Modified-Since is only honoured while a Last-Modified is sent (see `cache_headers`).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = headers["ETag"]
+        current = {etag, *(encoded_etag(etag, encoding) for encoding in ENCODINGS)}
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in current:
+                headers["ETag"] = tag
+                return True
+        return False
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(issue_store.last_modified) <= since
+    return False
+
+
+def cached_response(request: Request, cached, headers: dict) -> Response:
+    """Send a cached body, compressed if the client accepts it."""
+    encoding = preferred_encoding(request.headers.get("accept-encoding"))
+    body = cached.encoded(encoding)
+    if body is not cached.identity:
+        headers = {**headers, "Content-Encoding": encoding, "ETag": encoded_etag(headers["ETag"], encoding)}
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/issues")
-async def get_issues():
-    """API endpoint to get all recent issues."""
+async def get_issues(
+    request: Request,
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since_version: Optional[int] = Query(None, ge=0),
+    fields: Optional[str] = None,
+    q: Optional[str] = None,
+    repository: Optional[str] = None,
+    user: Optional[str] = None,
+    label: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """API endpoint to get recent issues, newest first, one page at a time.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page, and
+    `fields` (comma-separated) to return only some fields of each issue. `q`
+    (text search), `repository`, `user`, `label`, `since` and `until` (ISO 8601)
+    filter the issues on the server.
+    
+    Pass a previously returned `version` as `since_version` to get only the
+    issues stored since then (`"delta": true`). When that is not possible (more
+    than `limit` new issues, or a version from before a restart) the first page
+    is returned instead with `"delta": false`, and the client should replace
+    its list.
+    
+    Responses carry an ETag derived from the store version and honour
+    If-None-Match / If-Modified-Since with 304, so polling an unchanged list
+    skips the query and serialization. Clients without a cached copy get the
+    encoded (and gzip/brotli compressed) body cached for the same query.
+    """
+    headers = cache_headers(request)
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    
+    version = issue_store.version
+    cached = response_cache.get(version, request.url.query)
+    if cached is not None:
+        return cached_response(request, cached, headers)
+    
+    if cursor and since_version is not None:
+        raise HTTPException(status_code=400, detail="cursor and since_version cannot be combined")
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    selected = parse_fields(fields)
+    
+    filters = IssueFilter(
+        q=q,
+        repository=repository,
+        user=user,
+        label=label,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None
+    )
+    
+    payload = None
+    # Versions below the epoch were handed out before a restart (or by another database)
+    if since_version is not None and issue_store.epoch <= since_version <= version:
+        issues = issue_store.newer_than(since_version, limit + 1, filters)
+        if len(issues) <= limit:
+            payload = {
+                "total": len(issue_store),
+                "version": version,
+                "delta": True,
+                "issues": [issue.to_dict(selected) for issue in issues],
+                "next_cursor": None
+            }
+    
+    if payload is None:
+        # Fetch one extra issue to know whether another page exists
+        issues = issue_store.page(limit + 1, before, filters)
+        next_cursor = encode_cursor(issues[limit - 1]) if len(issues) > limit else None
+        payload = {
+            "total": len(issue_store),
+            "version": version,
+            "delta": False,
+            "issues": [issue.to_dict(selected) for issue in issues[:limit]],
+            "next_cursor": next_cursor
+        }
+    
+    cached = response_cache.put(version, request.url.query, dumps(payload))
+    return cached_response(request, cached, headers)
+
+
+@app.get("/api/issues/search")
+async def search_issues(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=API_MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    repository: Optional[str] = None,
+    user: Optional[str] = None,
+    label: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """API endpoint for ranked full-text search over issue titles, bodies, repositories and users.
+    
+    Every word of `q` must match (the last one also as a prefix); the best
+    matches come first with their relevance `score`. `fields`, `repository`,
+    `user`, `label`, `since` and `until` work as on `/api/issues`.
+    """
+    selected = parse_fields(fields)
+    filters = IssueFilter(
+        repository=repository,
+        user=user,
+        label=label,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None
+    )
+    
+    results = issue_store.search(q, limit, filters)
+    
+    return {
+        "total": len(issue_store),
+        "query": q,
+        "issues": [{**issue.to_dict(selected), "score": round(score, 4)} for issue, score in results]
+    }
+
+
+@app.get("/api/issues/stream")
+async def stream_issues(last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events stream of newly stored issues.
+    
+    Each `issue` event carries the issue, the store `version` and `total`, with
+    the version as event id: a reconnecting EventSource sends it back as
+    Last-Event-ID and first receives the issues it missed, or a `reset` event
+    when they are too many (or from before a restart) and it should reload.
+    """
+    # Subscribe before reading the backlog; nothing is stored in between
+    updates = issue_stream.subscribe()
+    
+    backlog = []
+    if last_event_id and last_event_id.isdigit():
+        last_seen = int(last_event_id)
+        known = issue_store.epoch <= last_seen <= issue_store.version
+        missed = issue_store.newer_than(last_seen, API_MAX_PAGE_SIZE + 1) if known else None
+        if missed is None or len(missed) > API_MAX_PAGE_SIZE:
+            backlog.append(sse_event("reset", {"version": issue_store.version}))
+        else:
+            backlog.extend(sse_event("issue", issue_payload(issue), issue.seq) for issue in reversed(missed))
+    
+    async def frames():
+        for frame in backlog:
+            yield frame
+        async for frame in updates:
+            yield frame
+    
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+@app.websocket("/ws/issues")
+async def issues_socket(websocket: WebSocket):
+    """WebSocket push channel: `issue` messages for new issues plus periodic `stats` snapshots.
+    
+    Each socket has a bounded send buffer. A client that cannot keep up loses
+    its oldest queued issues and is sent `{"type": "resync"}` (fetch the delta
+    from /api/issues), while stats snapshots are coalesced to the latest one.
+    A client that stops reading altogether is disconnected.
+    """
+    await websocket.accept()
+    outbox = issue_sockets.connect()
+    outbox.replace("stats", stats_message())
+    receiver = asyncio.ensure_future(receive_until_closed(websocket, outbox))
+    try:
+        while True:
+            batch = await outbox.drain()
+            if not batch:
+                break
+            await asyncio.wait_for(send_batch(websocket, batch), timeout=WEBSOCKET_SEND_TIMEOUT)
+        if not receiver.done():
+            # Server shutdown
+            await websocket.close()
+    except asyncio.TimeoutError:
+        issue_sockets.stalled += 1
+    except (OSError, RuntimeError):
+        pass  # Client went away mid-send
+    finally:
+        issue_sockets.disconnect(outbox)
+        receiver.cancel()
+
+
+async def send_batch(websocket: WebSocket, batch: list) -> None:
+    for message in batch:
+        await websocket.send_text(message)
+
+
+async def receive_until_closed(websocket: WebSocket, outbox) -> None:
+    """Consume client frames until the socket closes, then stop its sender."""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        outbox.close()
+
+
+def issue_payload(issue: IssueRecord) -> dict:
+    """Live-update payload announcing a stored issue."""
+    return {"version": issue.seq, "total": len(issue_store), "issue": issue.to_dict()}
+
+
+def stats_message() -> str:
+    """Stats snapshot pushed to WebSocket clients."""
+    return dumps({
+        "type": "stats",
+        "total": len(issue_store),
+        "version": issue_store.version,
+        "queue_depth": webhook_queue.stats()["depth"],
+        "live_clients": len(issue_sockets) + issue_stream.subscribers
+    }).decode("utf-8")
+
+
+def announce_issue(issue: IssueRecord) -> None:
+    """Push a stored issue to live dashboards; each message is encoded once for all clients."""
+    payload = issue_payload(issue)
+    issue_stream.publish(sse_event("issue", payload, issue.seq))
+    if len(issue_sockets):
+        issue_sockets.publish(dumps({"type": "issue", **payload}).decode("utf-8"))
+        issue_sockets.publish_latest("stats", stats_message())
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    """Validate a comma-separated `fields` parameter; None selects every field."""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(selected) - set(ISSUE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def record_issue(event: IssueOpenedEvent) -> None:
+    """Store a newly opened issue for the dashboard and push it to live dashboards."""
+    # Store issue data for dashboard
+    # Handle None body (issues without description)
+    issue_body = event.body or ""
+    truncated_body = issue_body[:200] + "..." if len(issue_body) > 200 else issue_body
+    
+    issue_record = IssueRecord(
+        number=event.number,
+        title=event.title,
+        body=truncated_body,
+        repository=event.full_name,
+        user=event.user_login,
+        user_avatar=event.user_avatar,
+        url=event.html_url,
+        created_at=event.created_at,
+        timestamp=time.time(),
+        labels=event.labels
+    )
+    
+    # Add to recent issues (keeps only the last MAX_STORED_ISSUES) and push it to live dashboards
+    issue_store.add(issue_record)
+    announce_issue(issue_record)
+
+
+async def post_guidelines_comment(event: IssueOpenedEvent, resumed: bool = False,
+                                  max_wait: Optional[float] = None) -> dict:
+    """Post the PR guidelines comment; `resumed` first checks whether an earlier try already posted it.
+    
+    `max_wait` caps the wait for the installation's rate-limit slot (see `GitHubClient.create_issue_comment`).
+    """
+    # Get installation access token
+    access_token = await get_installation_access_token(event.installation_id)
+    
+    # Post the comment
+    # The bot comments once per issue, so the issue itself is the idempotency key
+    async def post(token: str) -> None:
+        await github.create_issue_comment(
+            token, event.owner, event.repo, event.number, PR_GUIDELINES,
+            installation_id=event.installation_id, idempotency_key=event.full_name + "#" + str(event.number),
+            check_existing=resumed, max_wait=max_wait
+        )
+    
+    try:
+        await post(access_token)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 401:
+            raise
+        # The cached token was revoked (e.g. the app was reinstalled): fetch a new one and retry once
+        token_cache.invalidate(event.installation_id, access_token)
+        await post(await get_installation_access_token(event.installation_id))
+    
     return {
-        "total": len(recent_issues),
-        "issues": recent_issues
+        "status": "success",
+        "message": f"Comment posted on issue #{event.number}",
+        "repository": event.full_name
     }
 
 
+journal = WebhookJournal(WEBHOOK_JOURNAL_PATH) if WEBHOOK_JOURNAL_PATH else None
+event_router = EventRouter(parse_routes(WEBHOOK_EVENTS))
+
+
+async def process_queued_event(job) -> None:
+    """Process a queued event and mark its journal entry as done.
+    
+    Jobs are `(journal_id, event, recorded, resumed)`: `recorded` skips storing
+    an issue that is already on the dashboard, and `resumed` (deferred and
+    replayed jobs) checks for an already posted comment first. While a GitHub
+    circuit breaker is open, or the installation's rate limit has not cleared,
+    the worker waits for it instead of failing the job.
+    """
+    journal_id, event, recorded, resumed = job
+    try:
+        if not recorded:
+            record_issue(event)
+        while True:
+            try:
+                await post_guidelines_comment(event, resumed=resumed)
+                break
+            except (CircuitOpenError, RateLimitExceeded) as e:
+                await asyncio.sleep(e.retry_in)
+    except asyncio.CancelledError:
+        # Interrupted by shutdown: keep the journal entry so it is replayed on restart
+        raise
+    except Exception:
+        # Failures are logged by the queue and not retried from the journal
+        if journal is not None and journal_id is not None:
+            journal.mark_done(journal_id)
+        raise
+    if journal is not None and journal_id is not None:
+        journal.mark_done(journal_id)
+
+
+# Queue used when WEBHOOK_ASYNC_PROCESSING is enabled and for journal replay
+webhook_queue = WebhookQueue(process_queued_event, workers=WEBHOOK_WORKERS, maxsize=WEBHOOK_QUEUE_SIZE)
+
+
 @app.post("/webhook")
 async def webhook(
     request: Request,
@@ -140,73 +687,48 @@ async def webhook(
     if not verify_signature(payload_body, x_hub_signature_256):
         raise HTTPException(status_code=403, detail="Invalid signature")
     
-    # Parse the JSON payload
-    payload = await request.json()
-    
-    # Handle only "issues" events
-    if x_github_event == "issues":
-        action = payload.get("action")
-        
-        # Only respond to newly opened issues
-        if action == "opened":
-            issue = payload.get("issue")
-            repository = payload.get("repository")
-            installation = payload.get("installation")
-            
-            if not all([issue, repository, installation]):
-                return {"status": "skipped", "reason": "Missing required data"}
-            
-            installation_id = installation.get("id")
-            issue_number = issue.get("number")
-            repo_full_name = repository.get("full_name")
-            
-            try:
-                # Get installation access token
-                access_token = get_installation_access_token(installation_id)
-                
-                # Create GitHub client
-                g = Github(access_token)
-                repo = g.get_repo(repo_full_name)
-                issue_obj = repo.get_issue(issue_number)
-                
-                # Store issue data for dashboard
-                # Handle None body (issues without description)
-                issue_body = issue.get("body") or ""
-                truncated_body = issue_body[:200] + "..." if len(issue_body) > 200 else issue_body
-                
-                issue_data = {
-                    "number": issue_number,
-                    "title": issue.get("title"),
-                    "body": truncated_body,
-                    "repository": repo_full_name,
-                    "user": issue.get("user", {}).get("login"),
-                    "user_avatar": issue.get("user", {}).get("avatar_url"),
-                    "url": issue.get("html_url"),
-                    "created_at": issue.get("created_at"),
-                    "timestamp": datetime.now().isoformat(),
-                    "labels": [label.get("name") for label in issue.get("labels", [])]
-                }
-                
-                # Add to recent issues (keep only last MAX_STORED_ISSUES)
-                recent_issues.insert(0, issue_data)
-                if len(recent_issues) > MAX_STORED_ISSUES:
-                    recent_issues.pop()
-                
-                # Post the comment
-                issue_obj.create_comment(PR_GUIDELINES)
-                
-                return {
-                    "status": "success",
-                    "message": f"Comment posted on issue #{issue_number}",
-                    "repository": repo_full_name
-                }
-            
-            except Exception as e:
-                print(f"Error posting comment: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
-    
-    # For other events, just acknowledge
-    return {"status": "ok", "event": x_github_event}
+    # Unsubscribed events and actions are acknowledged from the headers and a byte-level
+    # probe of the action, without decoding the payload
+    if not event_router.prefilter(x_github_event, payload_body):
+        return {"status": "ok", "event": x_github_event}
+    
+    # Decode just the fields the bot uses, once, from the verified bytes
+    action, event = decode_issues_event(payload_body)
+    
+    # Only respond to subscribed actions (newly opened issues by default)
+    if not event_router.accepts(x_github_event, action):
+        return {"status": "ok", "event": x_github_event}
+    
+    if event is None:
+        return {"status": "skipped", "reason": "Missing required data"}
+    
+    # Persist the event before acknowledging so a restart can replay it
+    journal_id = await journal.append(x_github_event, payload_body) if journal else None
+    
+    # Acknowledge right away and let the worker pool do the GitHub calls
+    if WEBHOOK_ASYNC_PROCESSING:
+        if not webhook_queue.submit((journal_id, event, False, False)):
+            if journal_id is not None:
+                journal.mark_done(journal_id)
+            raise HTTPException(status_code=503, detail="Webhook queue is full")
+        return JSONResponse(status_code=202, content={"status": "queued", "event": x_github_event})
+    
+    record_issue(event)
+    try:
+        return await post_guidelines_comment(event, max_wait=WEBHOOK_SYNC_MAX_WAIT)
+    except (CircuitOpenError, RateLimitExceeded) as e:
+        # GitHub is failing or rate limited: hand the comment to the worker pool instead of waiting on it here
+        await webhook_queue.start()
+        if not webhook_queue.submit((journal_id, event, True, True)):
+            raise HTTPException(status_code=503, detail=str(e))
+        journal_id = None  # The worker marks it done
+        return JSONResponse(status_code=202, content={"status": "deferred", "event": x_github_event})
+    except Exception as e:
+        print(f"Error posting comment: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    finally:
+        if journal_id is not None:
+            journal.mark_done(journal_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""Requests per second on `/api/issues` with and without the encoded response cache.
+
+Fills the store with `--issues` issues and drives the FastAPI app in-process
+with `--concurrency` concurrent clients for `--duration` seconds per mode,
+all polling the same page the way open dashboards do between new issues.
+"uncached" re-queries and re-encodes every response (the behaviour before
+the cache); the cached modes serve the stored body, uncompressed or gzipped.
+No If-None-Match is sent, so every request gets a full body.
+
+    python benchmarks/bench_api_issues.py --issues 1000 --limit 100 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+
+from common import configure_app_env, percentile
+
+configure_app_env()
+
+import httpx  # noqa: E402
+
+import app as bot  # noqa: E402
+from issue_store import IssueRecord  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+MODES = [
+    ("uncached", 0, "identity"),
+    ("cached", 128, "identity"),
+    ("cached, gzip", 128, "gzip"),
+]
+
+
+def fill_store(count: int) -> None:
+    for number in range(count):
+        bot.issue_store.add(IssueRecord(
+            number=number,
+            title=f"Dashboard fails to load issue list after update #{number}",
+            body="Steps to reproduce: open the dashboard, apply the 24h filter, reload. " * 3,
+            repository=f"octo-org/repo-{number % 20}",
+            user=f"user-{number % 300}",
+            user_avatar=f"https://avatars.githubusercontent.com/u/{number % 300}",
+            url=f"https://github.com/octo-org/repo-{number % 20}/issues/{number}",
+            created_at="2026-10-17T08:15:02Z",
+            timestamp=time.time(),
+            labels=("bug", "ui"),
+        ))
+
+
+async def run(mode: str, cache_size: int, encoding: str, args) -> None:
+    bot.response_cache = ResponseCache(max_entries=cache_size)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=bot.app), base_url="http://bench")
+    headers = {"Accept-Encoding": encoding}
+    url = f"/api/issues?limit={args.limit}"
+    latencies = []
+    sizes = []
+    deadline = time.perf_counter() + args.duration
+
+    async def poll():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            # Raw bytes: the client should not pay for decompressing
+            async with client.stream("GET", url, headers=headers) as response:
+                size = sum([len(chunk) async for chunk in response.aiter_raw()])
+            latencies.append(time.perf_counter() - start)
+            sizes.append(size)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(poll() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    print(f"{mode:<14}{len(latencies) / elapsed:>10,.0f} req/s   p50 {percentile(latencies, 50) * 1000:6.2f} ms"
+          f"   p99 {percentile(latencies, 99) * 1000:6.2f} ms   {sizes[-1]:>8,} bytes/response")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--issues", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    args = parser.parse_args()
+
+    fill_store(args.issues)
+    print(f"{args.issues} issues stored, polling pages of {args.limit}")
+    for mode, cache_size, encoding in MODES:
+        asyncio.run(run(mode, cache_size, encoding, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cost of turning a webhook body into what the handler needs.
+
+Compares the old approach (decode the whole payload into dicts, then pick
+fields) with `decode_issues_event`, and shows the cost of rejecting
+unsubscribed deliveries: other event types on the `X-GitHub-Event` header
+alone, other `issues` actions with the byte-level action probe.
+
+    python benchmarks/bench_event_decode.py --iterations 20000
+"""
+import argparse
+import json
+import timeit
+
+from common import load_fixtures
+
+import json_backend
+import webhook_events
+
+
+def extract_dict(body: bytes) -> dict:
+    """The pre-typed handler: full stdlib decode, then a dict of the used fields."""
+    payload = json.loads(body)
+    issue = payload["issue"]
+    return {
+        "installation_id": payload["installation"]["id"],
+        "full_name": payload["repository"]["full_name"],
+        "number": issue["number"],
+        "title": issue["title"],
+        "body": issue["body"],
+        "user": issue["user"]["login"],
+        "avatar": issue["user"]["avatar_url"],
+        "url": issue["html_url"],
+        "created_at": issue["created_at"],
+        "labels": [label["name"] for label in issue["labels"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    body = load_fixtures()["issues_opened"]
+    edited = body.replace(b'"action":"opened"', b'"action":"edited"', 1)
+    router = webhook_events.EventRouter(webhook_events.parse_routes("issues:opened"))
+    typed = "msgspec structs" if webhook_events.msgspec else f"{json_backend.BACKEND} + slots"
+    cases = {
+        "stdlib dict (before)": lambda: extract_dict(body),
+        f"typed ({typed})": lambda: webhook_events.decode_issues_event(body),
+        "ignored event (header)": lambda: router.prefilter("push", body),
+        "ignored action (byte probe)": lambda: router.prefilter("issues", edited),
+        "ignored action (stdlib decode)": lambda: json.loads(edited)["action"] == "opened",
+    }
+    print(f"payload: {len(body)} bytes")
+    for name, fn in cases.items():
+        seconds = timeit.timeit(fn, number=args.iterations)
+        print(f"{name:<34}{seconds / args.iterations * 1e6:>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
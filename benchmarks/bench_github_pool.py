@@ -0,0 +1,87 @@
+"""GitHub calls through one pooled keep-alive client vs. a new client per call.
+
+Starts `mock_github.py` over TLS in a child process and replays `--webhooks`
+simulated webhooks (a token exchange plus a comment each) with
+`--concurrency` in flight. "client per call" opens a fresh client, and so a
+fresh TCP connection and TLS handshake, for every request, as the old
+PyGithub code did; "shared pool" is the app's single `GitHubClient`. Both
+report the connections opened and time spent in handshakes from the
+client's trace counters.
+
+    python benchmarks/bench_github_pool.py --webhooks 500 --concurrency 4
+"""
+import argparse
+import asyncio
+import tempfile
+
+from common import Timer, percentile
+
+from github_client import GitHubClient
+from mock_github import start_mock_github, write_self_signed_cert
+
+
+async def replay(args, base_url: str, verify, shared: bool) -> dict:
+    pool = GitHubClient(base_url, verify=verify) if shared else None
+    clients = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def call(method, *call_args):
+        if pool is not None:
+            return await getattr(pool, method)(*call_args)
+        client = GitHubClient(base_url, verify=verify)
+        clients.append(client)
+        try:
+            return await getattr(client, method)(*call_args)
+        finally:
+            await client.aclose()
+
+    async def webhook(number: int):
+        async with semaphore:
+            with Timer() as timer:
+                token = await call("create_installation_token", number % 10, "jwt")
+                await call("create_issue_comment", token["token"], "octo-org", "octo-repo", number, "Thanks!")
+            latencies.append(timer.elapsed)
+
+    with Timer() as total:
+        await asyncio.gather(*(webhook(number) for number in range(args.webhooks)))
+    if pool is not None:
+        clients.append(pool)
+        await pool.aclose()
+    return {
+        "elapsed": total.elapsed,
+        "latencies": latencies,
+        "connections": sum(client.connections_opened for client in clients),
+        "handshake_ms": sum(client.handshake_seconds for client in clients) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--webhooks", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--plain", action="store_true", help="plain HTTP instead of TLS")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile = keyfile = None
+        if not args.plain:
+            certfile, keyfile = write_self_signed_cert(directory)
+        server = start_mock_github(args.port, certfile, keyfile)
+        try:
+            scheme = "http" if args.plain else "https"
+            base_url = f"{scheme}://127.0.0.1:{args.port}"
+            for label, shared in (("client per call", False), ("shared pool", True)):
+                result = asyncio.run(replay(args, base_url, certfile or True, shared))
+                latencies = result["latencies"]
+                print(f"{label:<16}{args.webhooks / result['elapsed']:>8,.0f} webhooks/s   "
+                      f"p50 {percentile(latencies, 50) * 1000:6.1f} ms   p99 {percentile(latencies, 99) * 1000:6.1f} ms   "
+                      f"{result['connections']:>5} connections, {result['handshake_ms']:,.0f} ms in handshakes")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Bytes per stored issue: the old 10-key dict layout vs `IssueRecord`.
+
+Every issue is built from freshly allocated strings, as it would be after
+decoding a webhook payload, and measured with tracemalloc. Repositories, users
+and labels repeat across issues the way they do in a real installation.
+
+    python benchmarks/bench_issue_memory.py --issues 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from common import ROOT  # noqa: F401  (puts the app on sys.path)
+
+from issue_store import IssueRecord
+
+LABELS = ["bug", "enhancement", "documentation", "good first issue", "help wanted", "question"]
+
+
+def fresh(value: str) -> str:
+    """A new string object with the same contents, like a JSON decoder would produce."""
+    return (" " + value)[1:]
+
+
+def issue_fields(number: int, rng: random.Random) -> dict:
+    repo = f"org-{rng.randrange(20)}/repo-{rng.randrange(50)}"
+    user = f"user-{rng.randrange(2000)}"
+    return {
+        "number": number,
+        "title": fresh(f"Something is broken in component {number}"),
+        "body": fresh("Steps to reproduce: run the app and open the dashboard. " * 3),
+        "repository": fresh(repo),
+        "user": fresh(user),
+        "user_avatar": fresh(f"https://avatars.githubusercontent.com/u/{hash(user) % 10**7}?v=4"),
+        "url": fresh(f"https://github.com/{repo}/issues/{number}"),
+        "created_at": fresh("2026-10-17T08:15:02Z"),
+        "labels": [fresh(label) for label in rng.sample(LABELS, rng.randrange(3))],
+    }
+
+
+def as_dict(fields: dict) -> dict:
+    return dict(fields, timestamp=datetime.now().isoformat())
+
+
+def as_record(fields: dict) -> IssueRecord:
+    return IssueRecord(timestamp=time.time(), **dict(fields, labels=tuple(fields["labels"])))
+
+
+def measure(build, count: int) -> float:
+    rng = random.Random(42)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(issue_fields(n, rng)) for n in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--issues", type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, build in (("dict (before)", as_dict), ("IssueRecord", as_record)):
+        print(f"{name:<16}{measure(build, args.issues):>10.0f} bytes/issue")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Insert and snapshot cost of the dashboard issue store at large capacities.
+
+Compares the old `list.insert(0, ...)` + `pop()` scheme with the `MemoryIssueStore`
+ring buffer, filling each to capacity and then inserting the same number again
+so every insert also evicts.
+
+    python benchmarks/bench_issue_store.py --capacity 100000
+"""
+import argparse
+import time
+
+from common import Timer
+
+from issue_store import IssueRecord, MemoryIssueStore
+
+
+def make_issue(number: int) -> IssueRecord:
+    return IssueRecord(number, f"Issue {number}", "", "octo-org/octo-repo", "octocat", None, None, None,
+                       time.time(), ())
+
+
+class ListStore:
+    """The previous newest-first list."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.issues = []
+
+    def add(self, issue: IssueRecord) -> None:
+        self.issues.insert(0, issue)
+        if len(self.issues) > self.capacity:
+            self.issues.pop()
+
+    def recent(self) -> list:
+        return list(self.issues)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=100000)
+    args = parser.parse_args()
+
+    issues = [make_issue(n) for n in range(args.capacity * 2)]
+    print(f"{'store':<14}{'insert us':>12}{'snapshot ms':>14}")
+    for name, store in (("list (before)", ListStore(args.capacity)), ("ring buffer", MemoryIssueStore(args.capacity))):
+        with Timer() as insert:
+            for issue in issues:
+                store.add(issue)
+        with Timer() as snapshot:
+            store.recent()
+        print(f"{name:<14}{insert.elapsed / len(issues) * 1e6:>12.3f}{snapshot.elapsed * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
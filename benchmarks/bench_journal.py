@@ -0,0 +1,53 @@
+"""Sustained append throughput of the webhook journal, with and without group commit.
+
+Each append must be fsynced before the webhook is acknowledged. With group
+commit, appends that arrive while a commit is in flight share the next one;
+the per-event run caps batches at one event, i.e. one fsync per delivery.
+
+    python benchmarks/bench_journal.py --events 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from common import Timer, issue_opened_payload
+
+from journal import WebhookJournal
+
+
+async def run(args, group: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        journal = WebhookJournal(os.path.join(directory, "journal.db"), max_batch=512 if group else 1)
+        await journal.open()
+        payload = json.dumps(issue_opened_payload()).encode("utf-8")
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def accept():
+            async with semaphore:
+                entry_id = await journal.append("issues", payload)
+                journal.mark_done(entry_id)
+
+        with Timer() as timer:
+            await asyncio.gather(*(accept() for _ in range(args.events)))
+        stats = journal.stats()
+        await journal.close()
+    return {"events_per_sec": args.events / timer.elapsed, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64, help="webhooks being accepted at once")
+    args = parser.parse_args()
+
+    print(f"{'mode':<14}{'events/s':>10}{'commits':>10}{'avg batch':>11}{'commit ms':>11}")
+    for group in (False, True):
+        result = asyncio.run(run(args, group))
+        print(f"{'group commit' if group else 'per-event':<14}{result['events_per_sec']:>10.0f}"
+              f"{result['commits']:>10}{result['avg_append_batch']:>11.1f}{result['avg_commit_ms']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
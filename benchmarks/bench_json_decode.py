@@ -0,0 +1,49 @@
+"""Decode cost of realistic GitHub webhook payloads per JSON backend.
+
+Payloads are the fixtures in `benchmarks/fixtures/`, minified the way GitHub
+sends them. "stdlib" is what `await request.json()` used to cost; the other
+rows are the backends `json_backend` picks up when installed.
+
+    python benchmarks/bench_json_decode.py --iterations 20000
+"""
+import argparse
+import json
+import timeit
+
+from common import load_fixtures
+
+import json_backend
+
+
+def backends():
+    available = {"stdlib": json.loads}
+    try:
+        import orjson
+        available["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        available["msgspec"] = msgspec.json.Decoder().decode
+    except ImportError:
+        pass
+    return available
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"active backend: {json_backend.BACKEND}")
+    print(f"{'fixture':<22}{'bytes':>8}" + "".join(f"{name + ' us':>14}" for name in backends()))
+    for name, body in load_fixtures().items():
+        row = f"{name:<22}{len(body):>8}"
+        for decode in backends().values():
+            seconds = timeit.timeit(lambda: decode(body), number=args.iterations)
+            row += f"{seconds / args.iterations * 1e6:>14.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Full-text search: inverted index vs. a linear substring scan over the stored issues.
+
+Fills a ring buffer (and, with `--sqlite`, an FTS5-indexed SQLite store) with
+`--issues` synthetic issues whose words follow a Zipf-like distribution, then
+times rare, common, multi-word and prefix queries against each.
+
+    python benchmarks/bench_search.py --issues 500000 --sqlite
+"""
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+from common import Timer
+
+from issue_store import IssueRecord, MemoryIssueStore, SQLiteIssueStore
+
+QUERIES = [
+    ("rare word", "zulqor"),
+    ("common word", "error"),
+    ("two words", "error dashboard"),
+    ("prefix (search as you type)", "dashb"),
+    ("no match", "nonexistentword"),
+]
+COMMON_WORDS = [
+    "error", "crash", "dashboard", "login", "page", "fails", "when", "after", "update",
+    "button", "broken", "slow", "timeout", "request", "missing", "docs", "build",
+]
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    syllables = ["ka", "lo", "mi", "zu", "ra", "te", "qor", "vin", "sa", "el", "dor", "pi"]
+    words = {"".join(rng.choice(syllables) for _ in range(rng.randrange(2, 5))) for _ in range(size)}
+    words.add("zulqor")
+    return COMMON_WORDS + sorted(words)
+
+
+def make_issue(number: int, rng: random.Random, vocabulary, weights) -> IssueRecord:
+    title = " ".join(rng.choices(vocabulary, weights, k=rng.randrange(4, 10)))
+    body = " ".join(rng.choices(vocabulary, weights, k=rng.randrange(10, 30)))[:200]
+    return IssueRecord(
+        number=number,
+        title=title.capitalize(),
+        body=body,
+        repository=f"org-{rng.randrange(50)}/repo-{rng.randrange(200)}",
+        user=f"user-{rng.randrange(20000)}",
+        user_avatar=None,
+        url=None,
+        created_at="2026-10-17T08:15:02Z",
+        timestamp=1.7e9 + number,
+        labels=(),
+    )
+
+
+def linear_scan(store: MemoryIssueStore, query: str, limit: int):
+    """What the dashboard did before the index: substring tests on every issue."""
+    words = query.lower().split()
+    matches = []
+    for issue in store.recent():
+        text = f"{issue.title}\n{issue.body}".lower()
+        if all(word in text for word in words):
+            matches.append(issue)
+            if len(matches) == limit:
+                break
+    return matches
+
+
+def time_query(label: str, fn, number: int) -> None:
+    seconds = timeit.timeit(fn, number=number)
+    print(f"  {label:<30}{seconds / number * 1000:>10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--issues", type=int, default=500000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--sqlite", action="store_true", help="also benchmark the FTS5-backed SQLite store")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(rng, 20000)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    issues = [make_issue(number, rng, vocabulary, weights) for number in range(args.issues)]
+
+    # Half capacity, so the second half of the inserts also evicts from the index
+    store = MemoryIssueStore(capacity=args.issues // 2)
+    with Timer() as build:
+        for issue in issues:
+            store.add(issue)
+    print(f"indexed {args.issues} issues at {args.issues / build.elapsed:,.0f} issues/s, "
+          f"{len(store)} kept: {store._index.stats()}")
+
+    print("linear substring scan")
+    for label, query in QUERIES:
+        time_query(label, lambda: linear_scan(store, query, args.limit), number=3)
+    print("inverted index (ranked)")
+    for label, query in QUERIES:
+        time_query(label, lambda: store.search(query, args.limit), number=20)
+
+    if args.sqlite:
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite_store = SQLiteIssueStore(os.path.join(directory, "issues.db"), batch_size=1000)
+            with Timer() as insert:
+                for issue in issues[args.issues // 2:]:
+                    sqlite_store.add(issue)
+                sqlite_store.flush()
+            print(f"SQLite FTS5 (ranked, {len(sqlite_store)} rows inserted at "
+                  f"{len(sqlite_store) / insert.elapsed:,.0f} rows/s)")
+            for label, query in QUERIES:
+                time_query(label, lambda: sqlite_store.search(query, args.limit), number=20)
+            sqlite_store.close()
+
+
+if __name__ == "__main__":
+    main()
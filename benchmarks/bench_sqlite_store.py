@@ -0,0 +1,76 @@
+"""Batched insert rate and indexed query latency of the SQLite issue store.
+
+Fills a fresh database with `--rows` issues spread over many repositories,
+users and labels, then times the dashboard queries against it.
+
+    python benchmarks/bench_sqlite_store.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import timeit
+
+from common import Timer
+
+from issue_store import IssueRecord, SQLiteIssueStore
+
+LABELS = ["bug", "enhancement", "documentation", "good first issue", "help wanted", "question"]
+
+
+def make_issue(number: int, rng: random.Random, timestamp: float) -> IssueRecord:
+    repository = f"org-{rng.randrange(50)}/repo-{rng.randrange(200)}"
+    return IssueRecord(
+        number=number,
+        title=f"Something is broken in component {number}",
+        body="Steps to reproduce: run the app and open the dashboard.",
+        repository=repository,
+        user=f"user-{rng.randrange(20000)}",
+        user_avatar=None,
+        url=None,
+        created_at="2026-10-17T08:15:02Z",
+        timestamp=timestamp,
+        labels=tuple(rng.sample(LABELS, rng.randrange(3))),
+    )
+
+
+def time_query(label: str, fn, number: int = 200) -> None:
+    seconds = timeit.timeit(fn, number=number)
+    print(f"{label:<34}{seconds / number * 1000:>10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteIssueStore(os.path.join(directory, "issues.db"), batch_size=args.batch_size)
+        with Timer() as insert:
+            for number in range(args.rows):
+                store.add(make_issue(number, rng, 1.7e9 + number))
+            store.flush()
+        print(f"inserted {args.rows} rows at {args.rows / insert.elapsed:,.0f} rows/s (batch {args.batch_size})")
+
+        conn = store._conn
+        time_query("recent(100)", lambda: store.recent(100))
+        time_query("newest 100 in one repository", lambda: conn.execute(
+            "SELECT seq FROM issues WHERE repository = ? ORDER BY timestamp DESC LIMIT 100", ("org-7/repo-42",)
+        ).fetchall())
+        time_query("newest 100 by one user", lambda: conn.execute(
+            "SELECT seq FROM issues WHERE user = ? ORDER BY timestamp DESC LIMIT 100", ("user-123",)
+        ).fetchall())
+        time_query("newest 100 with a label", lambda: conn.execute(
+            "SELECT seq FROM issue_labels WHERE label = ? ORDER BY seq DESC LIMIT 100", ("help wanted",)
+        ).fetchall())
+        time_query("newest 100 in a time window", lambda: conn.execute(
+            "SELECT seq FROM issues WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp DESC LIMIT 100",
+            (1.7e9 + 1000, 1.7e9 + 50000)
+        ).fetchall())
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Fan-out of new issues to many idle `/api/issues/stream` (SSE) connections.
+
+Serves the app with uvicorn on a local port, opens `--clients` plain TCP
+connections to the stream and then stores `--events` issues, measuring how
+long each takes to reach every client and the memory held per connection
+(read from /proc, so Linux only). Clients and server share one process and
+event loop, so delivery times include the clients' own reads.
+
+    python benchmarks/bench_stream_fanout.py --clients 5000 --events 20
+"""
+import argparse
+import asyncio
+import resource
+import time
+
+from common import Timer, configure_app_env, percentile
+
+configure_app_env()
+
+import uvicorn  # noqa: E402
+
+import app as bot  # noqa: E402
+from issue_store import IssueRecord  # noqa: E402
+
+
+async def open_stream(port: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /api/issues/stream HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    return reader, writer
+
+
+async def receive(reader: asyncio.StreamReader, events: int, arrivals: list) -> None:
+    """Read SSE frames (one per `\\n\\n`), recording when each issue event arrives."""
+    received = 0
+    while received < events:
+        frame = await reader.readuntil(b"\n\n")
+        if b"event: issue" in frame:
+            arrivals[received].append(time.perf_counter())
+            received += 1
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def store_issue(number: int) -> None:
+    issue = IssueRecord(number, f"Issue {number}", "Body", "octo-org/octo-repo", "octocat",
+                        None, None, None, time.time(), ())
+    bot.issue_store.add(issue)
+    bot.announce_issue(issue)
+
+
+async def run(args) -> None:
+    server = uvicorn.Server(uvicorn.Config(bot.app, port=args.port, log_level="warning", backlog=4096))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    baseline = rss_bytes()
+    with Timer() as connect:
+        streams = []
+        for start in range(0, args.clients, 500):
+            streams += await asyncio.gather(*(open_stream(args.port) for _ in range(start, min(start + 500, args.clients))))
+    while bot.issue_stream.subscribers < args.clients:
+        await asyncio.sleep(0.01)
+    per_client = (rss_bytes() - baseline) / args.clients
+    print(f"{args.clients} streams connected in {connect.elapsed:.2f} s, "
+          f"~{per_client / 1024:.1f} KiB RSS per connection (server and client side)")
+
+    arrivals = [[] for _ in range(args.events)]
+    readers = [asyncio.ensure_future(receive(reader, args.events, arrivals)) for reader, _ in streams]
+    fanout = []
+    for number in range(args.events):
+        published = time.perf_counter()
+        store_issue(number)
+        while len(arrivals[number]) < args.clients:
+            await asyncio.sleep(0.001)
+        fanout.append(max(arrivals[number]) - published)
+        await asyncio.sleep(args.interval)
+    await asyncio.gather(*readers)
+
+    print(f"time for one issue to reach all {args.clients} clients: "
+          f"p50 {percentile(fanout, 50) * 1000:.1f} ms, p99 {percentile(fanout, 99) * 1000:.1f} ms, "
+          f"max {max(fanout) * 1000:.1f} ms")
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+    for _, writer in streams:
+        writer.close()
+    bot.issue_stream.close()
+    server.should_exit = True
+    await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between stored issues (seconds)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.clients * 2 + 256)), hard))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Concurrent webhook throughput with blocking vs non-blocking GitHub I/O.
+
+The "blocking" mode reproduces the old handler, where synchronous PyGithub
+calls ran directly inside the webhook coroutine, by sleeping on the event loop
+for every simulated GitHub round trip. The "async" mode awaits the same
+latency, which is what the httpx-based `GitHubClient` does against the real API.
+The "queued" mode additionally enables WEBHOOK_ASYNC_PROCESSING, so latencies
+are time-to-acknowledge and throughput includes draining the worker queue.
+All modes drive the FastAPI app in-process and probe `/health` meanwhile.
+
+    python benchmarks/bench_webhook_concurrency.py --requests 200 --concurrency 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from common import Timer, configure_app_env, issue_opened_payload, percentile, webhook_request
+
+configure_app_env()
+
+import httpx  # noqa: E402
+
+import app as bot  # noqa: E402
+from github_auth import InstallationTokenCache  # noqa: E402
+from github_client import GitHubClient  # noqa: E402
+from work_queue import WebhookQueue  # noqa: E402
+
+
+def mock_github(latency: float, blocking: bool, calls: list):
+    """Build a mock GitHub API handler with a fixed per-request latency."""
+    async def handle(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if blocking:
+            time.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+        path = request.url.path
+        if path.endswith("/access_tokens"):
+            return httpx.Response(201, json={"token": "ghs_benchmark", "expires_at": "2099-01-01T00:00:00Z"})
+        if path.endswith("/comments"):
+            return httpx.Response(201, json={"id": 1})
+        return httpx.Response(200, json={})
+    return handle
+
+
+async def run(mode: str, args) -> dict:
+    calls = []
+    bot.github = GitHubClient(transport=httpx.MockTransport(mock_github(args.latency, mode == "blocking", calls)))
+    bot.token_cache = InstallationTokenCache(bot.fetch_installation_token)
+    bot.WEBHOOK_ASYNC_PROCESSING = mode == "queued"
+    if bot.WEBHOOK_ASYNC_PROCESSING:
+        bot.webhook_queue = WebhookQueue(bot.process_queued_event, workers=args.workers)
+        await bot.webhook_queue.start()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=bot.app), base_url="http://bench", timeout=None)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    webhook_latencies = []
+    health_latencies = []
+    done = asyncio.Event()
+
+    async def deliver(number: int):
+        payload = issue_opened_payload(number=number, installation_id=number % args.installations + 1)
+        body, headers = webhook_request(payload)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/webhook", content=body, headers=headers)
+            webhook_latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async def probe_health():
+        # Timed from when the probe is due, so event loop stalls show up as latency
+        while not done.is_set():
+            due = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            await client.get("/health")
+            health_latencies.append(time.perf_counter() - due)
+
+    prober = asyncio.create_task(probe_health())
+    with Timer() as timer:
+        await asyncio.gather(*(deliver(n) for n in range(args.requests)))
+        if bot.WEBHOOK_ASYNC_PROCESSING:
+            await bot.webhook_queue.stop()
+    done.set()
+    await prober
+    await client.aclose()
+    await bot.github.aclose()
+
+    return {
+        "mode": mode,
+        "throughput": args.requests / timer.elapsed,
+        "p50": percentile(webhook_latencies, 50),
+        "p99": percentile(webhook_latencies, 99),
+        "health_p99": percentile(health_latencies, 99),
+        "github_calls": len(calls) / args.requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated GitHub latency per call (s)")
+    parser.add_argument("--installations", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=16, help="worker pool size for the queued mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'/health p99 ms':>16}{'GitHub calls/event':>20}")
+    for mode in ("blocking", "async", "queued"):
+        result = asyncio.run(run(mode, args))
+        print(f"{result['mode']:<10}{result['throughput']:>10.1f}{result['p50'] * 1000:>10.1f}"
+              f"{result['p99'] * 1000:>10.1f}{result['health_p99'] * 1000:>16.1f}{result['github_calls']:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
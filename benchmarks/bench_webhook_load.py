@@ -0,0 +1,157 @@
+"""End-to-end webhook load test against the mock GitHub API.
+
+Starts `mock_github.py` (with the given latency and error injection) and the
+app under uvicorn, both as child processes on local ports, then replays
+signed `issues.opened` deliveries to `/webhook` at `--rate` per second for
+`--duration` seconds. Sends follow a fixed schedule whatever the responses
+do (open loop), and latency is measured from each delivery's scheduled
+time, so a backed-up server shows up as latency rather than as a lower
+offered rate. Reports latency percentiles, throughput, status codes and the
+GitHub calls the mock saw. With `--rate-limit`, the mock enforces a
+per-installation comment budget and the app's rate-limit scheduler has to
+queue and retry.
+
+    python benchmarks/bench_webhook_load.py --rate 100 --duration 10 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from common import ROOT, configure_app_env, issue_opened_payload, percentile, wait_for_port, webhook_request
+from mock_github import start_mock_github
+
+
+def start_app(port: int, mock_port: int, async_processing: bool, pace: float) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        GITHUB_API_URL=f"http://127.0.0.1:{mock_port}",
+        WEBHOOK_ASYNC_PROCESSING="true" if async_processing else "false",
+        GITHUB_RATE_LIMIT_PER_MINUTE=str(pace),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port, timeout=30)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+async def replay(args, deliveries) -> dict:
+    latencies = []
+    statuses = Counter()
+    client = httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}",
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=200),
+    )
+
+    async def deliver(scheduled: float, body: bytes, headers: dict):
+        try:
+            response = await client.post("/webhook", content=body, headers=headers)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - scheduled)
+
+    tasks = []
+    start = time.perf_counter()
+    for index, (body, headers) in enumerate(deliveries):
+        scheduled = start + index / args.rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(deliver(scheduled, body, headers)))
+    send_elapsed = time.perf_counter() - start
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    if args.async_processing:
+        # Acknowledged is not done: wait for the workers to post the comments
+        while True:
+            queue = (await client.get("/metrics")).json()["webhook_queue"]
+            if queue["depth"] == 0 and queue["busy_workers"] == 0:
+                break
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - start
+    metrics = (await client.get("/metrics")).json()
+    await client.aclose()
+    return {
+        "latencies": latencies,
+        "statuses": statuses,
+        "send_elapsed": send_elapsed,
+        "elapsed": elapsed,
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=50, help="deliveries per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--installations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock GitHub latency per call (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random mock latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock GitHub calls that fail")
+    parser.add_argument("--fail-after-write", type=float, default=0.0,
+                        help="fraction of failed mock comment calls that still store the comment")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="mock GitHub comments per installation per minute (0: unlimited)")
+    parser.add_argument("--pace", type=float, default=0,
+                        help="the app's GITHUB_RATE_LIMIT_PER_MINUTE (0: only follow the mock's rate-limit headers)")
+    parser.add_argument("--async-processing", action="store_true", help="run the app with WEBHOOK_ASYNC_PROCESSING")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per delivery (seconds)")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--mock-port", type=int, default=8011)
+    args = parser.parse_args()
+
+    configure_app_env()
+    count = int(args.rate * args.duration)
+    deliveries = [
+        webhook_request(issue_opened_payload(number, installation_id=number % args.installations + 1))
+        for number in range(1, count + 1)
+    ]
+
+    mock = start_mock_github(args.mock_port, extra_args=[
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+        "--fail-after-write", str(args.fail_after_write), "--rate-limit", str(args.rate_limit),
+    ])
+    server = None
+    try:
+        server = start_app(args.port, args.mock_port, args.async_processing, args.pace)
+        result = asyncio.run(replay(args, deliveries))
+        github_calls = httpx.get(f"http://127.0.0.1:{args.mock_port}/_mock/stats").json()
+    finally:
+        for process in (server, mock):
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    latencies = result["latencies"]
+    statuses = result["statuses"]
+    queue = result["metrics"]["webhook_queue"]
+    # With async processing a 202 only means queued; count the comments the workers posted
+    succeeded = queue["processed"] if args.async_processing else statuses[200]
+    print(f"offered {count} deliveries at {count / result['send_elapsed']:.1f}/s "
+          f"(target {args.rate:g}/s) over {result['send_elapsed']:.1f} s")
+    print(f"latency: p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    print(f"throughput: {succeeded / result['elapsed']:.1f} successful deliveries/s "
+          f"({'comments posted' if args.async_processing else 'responses'} within {result['elapsed']:.1f} s)")
+    print(f"status codes: {dict(statuses)}, error rate {(count - succeeded) / count:.2%}")
+    if args.async_processing:
+        print(f"queue: processed {queue['processed']}, failed {queue['failed']}, rejected {queue['rejected']}")
+    print(f"mock GitHub calls: {github_calls}")
+
+
+if __name__ == "__main__":
+    main()
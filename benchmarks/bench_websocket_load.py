@@ -0,0 +1,169 @@
+"""Many concurrent `/ws/issues` WebSocket clients, some of them stalled.
+
+Serves the app with uvicorn on a local port and opens `--clients` minimal
+WebSocket clients (raw asyncio streams, so the harness itself stays cheap).
+A `--stalled` fraction completes the handshake and then stops reading, like a
+frozen browser tab; those get a small socket receive buffer, as otherwise
+localhost TCP autotuning would absorb megabytes before the server noticed.
+`--events` issues of `--body-size` bytes are then stored, and the harness
+reports how long each takes to reach every reading client, how many messages
+were dropped for (or stalled clients disconnected by) the server, and the
+process RSS (read from /proc, so Linux only).
+
+    WEBSOCKET_SEND_TIMEOUT=1 python benchmarks/bench_websocket_load.py --clients 5000 --body-size 20000
+"""
+import argparse
+import asyncio
+import base64
+import os
+import resource
+import socket
+import struct
+import time
+
+from common import Timer, configure_app_env, percentile
+
+configure_app_env()
+
+import uvicorn  # noqa: E402
+
+import app as bot  # noqa: E402
+from issue_store import IssueRecord  # noqa: E402
+from json_backend import loads  # noqa: E402
+
+
+class RawClient:
+    """Just enough of RFC 6455 to read server text frames and answer pings."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port: int, receive_buffer: int = 0) -> "RawClient":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if receive_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        writer.write(
+            f"GET /ws/issues HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode("ascii")
+        )
+        await reader.readuntil(b"\r\n\r\n")
+        return cls(reader, writer)
+
+    async def recv(self) -> bytes:
+        while True:
+            head = await self.reader.readexactly(2)
+            opcode, length = head[0] & 0x0F, head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", await self.reader.readexactly(8))[0]
+            payload = await self.reader.readexactly(length)
+            if opcode == 0x9:
+                # Pong with an all-zero mask, so the payload goes out unchanged
+                self.writer.write(bytes([0x8A, 0x80 | len(payload)]) + b"\0\0\0\0" + payload)
+            elif opcode == 0x8:
+                raise ConnectionError("closed by server")
+            else:
+                return payload
+
+    def stall(self) -> None:
+        self.writer.transport.pause_reading()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+async def read_issues(client: RawClient, events: int, arrivals: list, resyncs: list) -> None:
+    received = 0
+    while received < events:
+        message = loads(await client.recv())
+        if message["type"] == "issue":
+            # Versions count up from the store's epoch
+            received = message["version"] - bot.issue_store.epoch
+            arrivals[received - 1].append(time.perf_counter())
+        elif message["type"] == "resync":
+            resyncs.append(client)
+
+
+async def run(args) -> None:
+    server = uvicorn.Server(uvicorn.Config(bot.app, port=args.port, log_level="warning", backlog=4096))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    stalled_count = int(args.clients * args.stalled)
+    baseline = rss_bytes()
+    with Timer() as connect:
+        clients = []
+        for start in range(0, args.clients, 500):
+            batch = range(start, min(start + 500, args.clients))
+            clients += await asyncio.gather(*(
+                RawClient.connect(args.port, 4096 if index < stalled_count else 0) for index in batch
+            ))
+    while len(bot.issue_sockets) < args.clients:
+        await asyncio.sleep(0.01)
+    stalled, reading = clients[:stalled_count], clients[stalled_count:]
+    for client in stalled:
+        client.stall()
+    print(f"{args.clients} sockets connected in {connect.elapsed:.2f} s ({stalled_count} stalled), "
+          f"~{(rss_bytes() - baseline) / args.clients / 1024:.1f} KiB RSS per socket (server and client side)")
+
+    arrivals = [[] for _ in range(args.events)]
+    resyncs = []
+    readers = [asyncio.ensure_future(read_issues(client, args.events, arrivals, resyncs)) for client in reading]
+    body = "x" * args.body_size
+    fanout = []
+    for number in range(args.events):
+        issue = IssueRecord(number, f"Issue {number}", body, "octo-org/octo-repo", "octocat",
+                            None, None, None, time.time(), ())
+        published = time.perf_counter()
+        bot.issue_store.add(issue)
+        bot.announce_issue(issue)
+        await asyncio.sleep(args.interval)
+        fanout.append(published)
+    await asyncio.wait_for(asyncio.gather(*readers), timeout=120)
+
+    # Clients may skip issues after a resync; measure the ones that arrived everywhere
+    latencies = [max(times) - fanout[index] for index, times in enumerate(arrivals) if len(times) == len(reading)]
+    if latencies:
+        print(f"time for one issue to reach all {len(reading)} reading clients: "
+              f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"reading clients that had to resync: {len(set(resyncs))}")
+    print(f"hub: {bot.issue_sockets.stats()}")
+    print(f"RSS now {rss_bytes() / 2 ** 20:.0f} MiB, "
+          f"peak {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+    for client in clients:
+        client.close()
+    server.should_exit = True
+    await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--stalled", type=float, default=0.1, help="fraction of clients that stop reading")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--body-size", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between stored issues (seconds)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.clients * 2 + 256)), hard))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
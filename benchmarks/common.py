@@ -0,0 +1,115 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run the app in-process, so they configure a throwaway app identity
+before `app` is imported. Import this module first.
+"""
+import glob
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+WEBHOOK_SECRET = "benchmark-secret"
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def configure_app_env() -> None:
+    """Set the GitHub App environment variables to a generated test identity."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode()
+    os.environ["GITHUB_APP_ID"] = "12345"
+    os.environ["GITHUB_PRIVATE_KEY"] = pem
+    os.environ["GITHUB_WEBHOOK_SECRET"] = WEBHOOK_SECRET
+
+
+def load_fixtures() -> dict:
+    """Return {name: payload bytes} for every fixture, minified the way GitHub sends them."""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, "rb") as f:
+            payload = json.load(f)
+        name = os.path.splitext(os.path.basename(path))[0]
+        fixtures[name] = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return fixtures
+
+
+def sign(body: bytes, secret: str = WEBHOOK_SECRET) -> str:
+    """Compute the X-Hub-Signature-256 header for a payload."""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def issue_opened_payload(number: int = 1, installation_id: int = 1, repo: str = "octo-org/octo-repo") -> dict:
+    """A minimal `issues.opened` delivery."""
+    owner, name = repo.split("/")
+    return {
+        "action": "opened",
+        "issue": {
+            "number": number,
+            "title": f"Benchmark issue {number}",
+            "body": "Steps to reproduce the problem",
+            "user": {"login": "octocat", "avatar_url": "https://github.com/images/error/octocat_happy.gif"},
+            "html_url": f"https://github.com/{repo}/issues/{number}",
+            "created_at": "2026-01-01T00:00:00Z",
+            "labels": [{"name": "bug"}],
+        },
+        "repository": {"name": name, "full_name": repo, "owner": {"login": owner}},
+        "installation": {"id": installation_id},
+    }
+
+
+def webhook_request(payload: dict, event: str = "issues"):
+    """Return (body, headers) for a signed webhook delivery."""
+    body = json.dumps(payload).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-Hub-Signature-256": sign(body),
+    }
+    return body, headers
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    """Block until something accepts connections on localhost:`port`."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"nothing listening on port {port} after {timeout:.0f} s")
+            time.sleep(0.05)
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,221 @@
+"""A local stand-in for the GitHub REST endpoints the bot calls.
+
+Serves installation token exchanges and issue comments over real sockets
+(optionally TLS with a throwaway self-signed certificate), so benchmarks can
+measure connection handling that `httpx.MockTransport` skips. Every response
+can be delayed by `--latency` seconds (plus up to `--jitter`), and a
+`--error-rate` fraction answered with `--error-status` instead (for comments,
+a `--fail-after-write` fraction of those after storing the comment). With
+`--rate-limit N`, each installation token may post N comments per
+`--rate-limit-window` seconds, with GitHub's `X-RateLimit-*` headers and a
+403 once the budget is spent. Call counts, including duplicate comments,
+are served at `/_mock/stats`. Run it on its own, or start it from a benchmark
+with `start_mock_github()`:
+
+    python benchmarks/mock_github.py --port 8443 --tls --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from fastapi import Body, FastAPI, Header, Response
+from fastapi.responses import JSONResponse
+
+from common import wait_for_port
+
+mock = FastAPI(title="Mock GitHub API")
+comment_ids = itertools.count(1)
+
+
+class Faults:
+    """Latency and error injection applied to every mocked endpoint."""
+
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    error_status = 502
+    # Fraction of injected comment errors returned after the comment was stored anyway
+    fail_after_write = 0.0
+    # Comments per token per window; 0 for no limit
+    rate_limit = 0
+    rate_limit_window = 60.0
+
+
+calls: Counter = Counter()
+issue_comments: Dict[Tuple[str, str, int], List[dict]] = defaultdict(list)
+# Token -> (window reset epoch seconds, comments posted in the window)
+rate_windows: Dict[str, Tuple[float, int]] = {}
+
+
+def spend_rate_limit(token: str, response: Response) -> Optional[JSONResponse]:
+    """Count a comment against the token's window; returns a 403 once the window is used up."""
+    now = time.time()
+    reset_at, used = rate_windows.get(token, (0.0, 0))
+    if now >= reset_at:
+        reset_at, used = now + Faults.rate_limit_window, 0
+    headers = {
+        "X-RateLimit-Limit": str(Faults.rate_limit),
+        "X-RateLimit-Remaining": str(max(0, Faults.rate_limit - used - 1)),
+        "X-RateLimit-Reset": str(int(reset_at) + 1),
+    }
+    if used >= Faults.rate_limit:
+        calls["rate_limited"] += 1
+        headers["X-RateLimit-Remaining"] = "0"
+        return JSONResponse(status_code=403, content={"message": "API rate limit exceeded"}, headers=headers)
+    rate_windows[token] = (reset_at, used + 1)
+    response.headers.update(headers)
+    return None
+
+
+async def inject(endpoint: str) -> Optional[JSONResponse]:
+    """Sleep for the configured latency; returns an error response for the injected fraction of calls."""
+    calls[endpoint] += 1
+    delay = Faults.latency + random.uniform(0, Faults.jitter)
+    if delay:
+        await asyncio.sleep(delay)
+    if Faults.error_rate and random.random() < Faults.error_rate:
+        calls[f"{endpoint}_errors"] += 1
+        return JSONResponse(status_code=Faults.error_status, content={"message": "Injected error"})
+    return None
+
+
+@mock.get("/_mock/stats")
+async def stats():
+    return dict(calls)
+
+
+@mock.post("/app/installations/{installation_id}/access_tokens", status_code=201)
+async def create_installation_token(installation_id: int):
+    error = await inject("access_tokens")
+    if error is not None:
+        return error
+    expires_at = datetime.datetime.utcfromtimestamp(time.time() + 3600).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {"token": f"ghs_mock{installation_id}", "expires_at": expires_at}
+
+
+@mock.post("/repos/{owner}/{repo}/issues/{number}/comments", status_code=201)
+async def create_issue_comment(owner: str, repo: str, number: int, response: Response,
+                               payload: dict = Body(...), authorization: Optional[str] = Header(None)):
+    error = await inject("comments")
+    if error is None and Faults.rate_limit:
+        rate_limited = spend_rate_limit(authorization or "", response)
+        if rate_limited is not None:
+            return rate_limited
+    # Some injected failures happen after the comment was stored, like a gateway timing out
+    if error is not None and random.random() >= Faults.fail_after_write:
+        return error
+    comments = issue_comments[(owner, repo, number)]
+    if any(comment["body"] == payload.get("body") for comment in comments):
+        calls["duplicate_comments"] += 1
+    comment_id = next(comment_ids)
+    comment = {
+        "id": comment_id,
+        "body": payload.get("body"),
+        "html_url": f"https://github.com/{owner}/{repo}/issues/{number}#issuecomment-{comment_id}",
+    }
+    comments.append(comment)
+    return error or comment
+
+
+@mock.get("/repos/{owner}/{repo}/issues/{number}/comments")
+async def list_issue_comments(owner: str, repo: str, number: int, per_page: int = 30):
+    calls["list_comments"] += 1
+    return issue_comments.get((owner, repo, number), [])[:per_page]
+
+
+def write_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """Write a localhost / 127.0.0.1 certificate and key to `directory`; returns (certfile, keyfile)."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certfile = os.path.join(directory, "mock-github.crt")
+    keyfile = os.path.join(directory, "mock-github.key")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    return certfile, keyfile
+
+
+def start_mock_github(port: int, certfile: Optional[str] = None, keyfile: Optional[str] = None,
+                      extra_args=()) -> subprocess.Popen:
+    """Run the mock in a child process (so it does not share the caller's event loop) and wait until it listens."""
+    command = [sys.executable, os.path.abspath(__file__), "--port", str(port), *extra_args]
+    if certfile:
+        command += ["--certfile", certfile, "--keyfile", keyfile]
+    process = subprocess.Popen(command)
+    try:
+        wait_for_port(port)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS with a generated self-signed certificate")
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with an error")
+    parser.add_argument("--error-status", type=int, default=502)
+    parser.add_argument("--fail-after-write", type=float, default=0.0,
+                        help="fraction of injected comment errors that happen after the comment was stored")
+    parser.add_argument("--rate-limit", type=int, default=0, help="comments per installation per window (0: none)")
+    parser.add_argument("--rate-limit-window", type=float, default=60.0, help="seconds")
+    args = parser.parse_args()
+
+    Faults.latency = args.latency
+    Faults.jitter = args.jitter
+    Faults.error_rate = args.error_rate
+    Faults.error_status = args.error_status
+    Faults.fail_after_write = args.fail_after_write
+    Faults.rate_limit = args.rate_limit
+    Faults.rate_limit_window = args.rate_limit_window
+
+    certfile, keyfile = args.certfile, args.keyfile
+    if args.tls and not certfile:
+        certfile, keyfile = write_self_signed_cert(tempfile.mkdtemp())
+        print(f"CA certificate for clients: {certfile}")
+    uvicorn.run(mock, host="127.0.0.1", port=args.port, log_level="warning",
+                ssl_certfile=certfile, ssl_keyfile=keyfile)
+
+
+if __name__ == "__main__":
+    main()
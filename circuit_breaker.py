@@ -0,0 +1,82 @@
+"""Circuit breakers that stop calling a failing GitHub endpoint until it recovers."""
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# How long callers refused during a half-open probe are told to wait
+PROBE_RETRY_SECONDS = 1.0
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open; the call was refused without contacting GitHub."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit breaker '{name}' is open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Classic three-state breaker for one class of GitHub calls.
+
+    Closed: calls go through; `failure_threshold` consecutive failures open it.
+    Open: calls fail immediately with `CircuitOpenError` for `reset_timeout`
+    seconds instead of each waiting for GitHub to time out. Half-open: one
+    probe call at a time is let through; a success closes the breaker, a
+    failure opens it again. A probe that never reports back is replaced after
+    `reset_timeout` seconds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Raise `CircuitOpenError` unless a call may go through now."""
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self._opened_at + self.reset_timeout - now
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+        elif now - self._probe_started < self.reset_timeout:
+            # Half-open with a probe already in flight
+            self.rejected += 1
+            raise CircuitOpenError(self.name, PROBE_RETRY_SECONDS)
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for the health and metrics endpoints."""
+        stats = {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+        if self.state == OPEN:
+            stats["retry_in"] = round(max(0.0, self._opened_at + self.reset_timeout - time.monotonic()), 1)
+        return stats
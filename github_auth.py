@@ -0,0 +1,169 @@
+"""GitHub App authentication helpers: app JWTs and cached installation access tokens."""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+# Fetches a fresh token for an installation, returning (token, expires_at epoch seconds)
+TokenFetcher = Callable[[int], Awaitable[Tuple[str, float]]]
+
+
+def to_epoch(value: datetime) -> float:
+    """Convert a GitHub timestamp to epoch seconds (naive values are treated as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def parse_github_timestamp(value: str) -> float:
+    """Parse an ISO 8601 timestamp such as `2016-07-11T22:14:10Z` into epoch seconds."""
+    return to_epoch(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+class AppJWTProvider:
+    """Mints the GitHub App JWT and hands out the cached copy until it nears expiry.
+
+    The PEM private key is parsed once at construction, so each mint only pays
+    for the RS256 signature itself.
+    """
+
+    def __init__(self, app_id: Union[int, str, None], private_key: str, lifetime: int = 540, refresh_margin: int = 60):
+        self.app_id = str(app_id) if app_id is not None else None
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self._key = None
+        if private_key:
+            self._key = serialization.load_pem_private_key(private_key.encode("utf-8"), password=None)
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self.sign_count = 0
+        self.sign_seconds_total = 0.0
+        self.last_sign_seconds = 0.0
+        self.cache_hits = 0
+
+    def get(self) -> str:
+        """Return a JWT with at least `refresh_margin` seconds of validity left."""
+        now = time.time()
+        if self._token is not None and now < self._expires_at - self.refresh_margin:
+            self.cache_hits += 1
+            return self._token
+        return self._sign(now)
+
+    def _sign(self, now: float) -> str:
+        if self._key is None or not self.app_id:
+            raise ValueError("GITHUB_APP_ID and GITHUB_PRIVATE_KEY must be configured")
+
+        started = time.perf_counter()
+        issued_at = int(now)
+        payload = {
+            'iat': issued_at - 60,  # Backdated to tolerate clock drift with GitHub
+            'exp': issued_at + self.lifetime,
+            'iss': self.app_id
+        }
+        token = jwt.encode(payload, self._key, algorithm='RS256')
+        elapsed = time.perf_counter() - started
+
+        self._token = token
+        self._expires_at = issued_at + self.lifetime
+        self.sign_count += 1
+        self.sign_seconds_total += elapsed
+        self.last_sign_seconds = elapsed
+        return token
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for the metrics endpoint."""
+        return {
+            "sign_count": self.sign_count,
+            "cache_hits": self.cache_hits,
+            "last_sign_ms": round(self.last_sign_seconds * 1000, 3),
+            "avg_sign_ms": round(self.sign_seconds_total / self.sign_count * 1000, 3) if self.sign_count else 0.0,
+            "expires_in": max(0, int(self._expires_at - time.time())),
+        }
+
+
+class InstallationTokenCache:
+    """Per-installation cache of access tokens.
+
+    Tokens are reused until `expiry_margin` seconds before their `expires_at`.
+    Once a token enters the `refresh_ahead` window it is still handed out, but a
+    background refresh is started so callers rarely wait on GitHub. Concurrent
+    refreshes for the same installation share a single in-flight request.
+    """
+
+    def __init__(self, fetch_token: TokenFetcher, expiry_margin: float = 60, refresh_ahead: float = 300):
+        self._fetch_token = fetch_token
+        self.expiry_margin = expiry_margin
+        self.refresh_ahead = max(refresh_ahead, expiry_margin)
+        self._tokens: Dict[int, Tuple[str, float]] = {}
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.refresh_errors = 0
+        self.invalidations = 0
+
+    async def get(self, installation_id: int) -> str:
+        """Return a valid token for the installation, fetching one if needed."""
+        cached = self._tokens.get(installation_id)
+        if cached is not None:
+            token, expires_at = cached
+            remaining = expires_at - time.time()
+            if remaining > self.expiry_margin:
+                self.hits += 1
+                if remaining <= self.refresh_ahead and installation_id not in self._inflight:
+                    self.background_refreshes += 1
+                    self._refresh(installation_id)
+                return token
+
+        self.misses += 1
+        # Shield so a cancelled webhook doesn't abort a refresh other callers share
+        return await asyncio.shield(self._refresh(installation_id))
+
+    def invalidate(self, installation_id: int, token: Optional[str] = None) -> None:
+        """Drop a cached token, e.g. after GitHub rejected it.
+
+        With `token`, only that token is dropped, so callers still holding a
+        rejected token don't discard the replacement another caller fetched.
+        """
+        cached = self._tokens.get(installation_id)
+        if cached is not None and (token is None or cached[0] == token):
+            del self._tokens[installation_id]
+            self.invalidations += 1
+
+    def _refresh(self, installation_id: int) -> "asyncio.Task[str]":
+        task = self._inflight.get(installation_id)
+        if task is None:
+            task = asyncio.ensure_future(self._do_refresh(installation_id))
+            self._inflight[installation_id] = task
+            task.add_done_callback(lambda t: self._refresh_done(installation_id, t))
+        return task
+
+    def _refresh_done(self, installation_id: int, task: asyncio.Task) -> None:
+        self._inflight.pop(installation_id, None)
+        # Retrieve the exception so background refresh failures aren't reported as
+        # "never retrieved"; foreground callers still see it through the await.
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+
+    async def _do_refresh(self, installation_id: int) -> str:
+        token, expires_at = await self._fetch_token(installation_id)
+        self._tokens[installation_id] = (token, expires_at)
+        self.refreshes += 1
+        return token
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "cached_installations": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "refresh_errors": self.refresh_errors,
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,236 @@
+"""Async client for the handful of GitHub REST endpoints the bot uses."""
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Union
+
+import httpx
+
+from circuit_breaker import CircuitBreaker
+from rate_limiter import RateLimitScheduler
+from retry import RETRY_STATUSES, RetryPolicy
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+    "User-Agent": "github-issue-commenter-bot",
+}
+# httpcore trace steps that open a new connection
+HANDSHAKE_STEPS = ("connection.connect_tcp", "connection.start_tls")
+# Endpoint classes, each with its own circuit breaker
+TOKEN_EXCHANGE = "token_exchange"
+COMMENTS = "comments"
+# Hidden marker appended to comments so retries can recognize one that was already posted
+COMMENT_MARKER_PREFIX = "issue-commenter:"
+# Failures that happen before the request reaches GitHub, so it cannot have been applied
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class GitHubClient:
+    """Thin wrapper around one long-lived `httpx.AsyncClient`.
+
+    All calls are awaited on the event loop, so a slow GitHub response only
+    delays the webhook that is waiting for it. Token exchanges and comments
+    share one keep-alive connection pool (HTTP/2 when `http2` is set and `h2`
+    is installed), so only the first request to GitHub pays for the TCP and
+    TLS handshakes; `stats()` shows how often connections are reused.
+
+    With a `scheduler`, every request first waits for its installation's
+    rate-limit slot, and a rate-limited response is retried once GitHub
+    allows instead of being raised (unless that is further away than the
+    scheduler's `max_wait`, see `RateLimitExceeded`). With a `retry` policy, connection errors
+    and 5xx responses are retried with backoff; a comment that may already
+    have been posted is looked up by its hidden marker first, so a retry
+    never comments twice. `breakers` maps endpoint classes (`TOKEN_EXCHANGE`,
+    `COMMENTS`) to circuit breakers that refuse calls with `CircuitOpenError`
+    while that endpoint keeps failing.
+    """
+
+    def __init__(self, base_url: str = "https://api.github.com", timeout: float = 15.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, max_connections: int = 100,
+                 max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 http2: bool = False, verify: Union[bool, str] = True,
+                 scheduler: Optional[RateLimitScheduler] = None, retry: Optional[RetryPolicy] = None,
+                 breakers: Optional[Dict[str, CircuitBreaker]] = None):
+        if http2 and h2 is None:
+            print("Warning: HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            verify=verify,
+        )
+        self.scheduler = scheduler
+        self.retry = retry
+        self.breakers = breakers or {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.deduplicated = 0
+        self.connections_opened = 0
+        self.handshake_seconds = 0.0
+        self.http_versions: Counter = Counter()
+
+    def _tracer(self):
+        """An httpx `trace` extension callback recording the handshakes of one request."""
+        started = {}
+
+        async def trace(event: str, info: dict) -> None:
+            step, _, phase = event.rpartition(".")
+            if step not in HANDSHAKE_STEPS:
+                return
+            if phase == "started":
+                started[step] = time.perf_counter()
+            elif phase == "complete":
+                self.handshake_seconds += time.perf_counter() - started.pop(step)
+                if step == "connection.connect_tcp":
+                    self.connections_opened += 1
+
+        return trace
+
+    async def _send(self, method: str, url: str, token: str, scheme: str, rate_key: Hashable,
+                    endpoint: str, max_wait: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Send one request in its rate-limit slot, waiting out and repeating rate-limited ones.
+
+        Raises `RateLimitExceeded` when the slot is further away than
+        `max_wait` seconds (the scheduler's limit by default).
+        """
+        breaker = self.breakers.get(endpoint)
+        while True:
+            if breaker is not None:
+                breaker.check()
+            if self.scheduler is not None:
+                await self.scheduler.acquire(rate_key, max_wait)
+            self.requests += 1
+            try:
+                response = await self._client.request(
+                    method,
+                    url,
+                    headers={"Authorization": f"{scheme} {token}"},
+                    extensions={"trace": self._tracer()},
+                    **kwargs
+                )
+            except httpx.TransportError:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            if breaker is not None:
+                if response.status_code in RETRY_STATUSES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            self.http_versions[response.http_version] += 1
+            if self.scheduler is not None and self.scheduler.update(
+                rate_key, response.status_code, response.headers, response.content
+            ):
+                self.rate_limited += 1
+                continue
+            return response
+
+    async def _request(self, method: str, url: str, token: str, scheme: str = "token",
+                       rate_key: Hashable = None, endpoint: str = COMMENTS,
+                       find_existing: Optional[Callable[[], Awaitable]] = None, maybe_applied: bool = False,
+                       max_wait: Optional[float] = None, **kwargs) -> Dict:
+        """Send a request, retrying transient failures when a retry policy is set.
+
+        Before repeating a request that may have been applied already (or
+        before the first attempt, with `maybe_applied`), the optional
+        `find_existing` is awaited; a non-None result is returned as is.
+        """
+        if self.retry is not None:
+            self.retry.start()
+        attempt = 1
+        while True:
+            try:
+                if maybe_applied and find_existing is not None:
+                    existing = await find_existing()
+                    if existing is not None:
+                        self.deduplicated += 1
+                        return existing
+                response = await self._send(method, url, token, scheme, rate_key, endpoint, max_wait, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                if self.retry is None or e.response.status_code not in RETRY_STATUSES:
+                    raise
+                maybe_applied = True
+                error, retry_after = e, e.response.headers.get("retry-after")
+            except httpx.TransportError as e:
+                if self.retry is None:
+                    raise
+                maybe_applied = maybe_applied or not isinstance(e, UNSENT_ERRORS)
+                error, retry_after = e, None
+            delay = self.retry.next_delay(attempt, retry_after)
+            if delay is None:
+                raise error
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def create_installation_token(self, installation_id: int, jwt_token: str) -> Dict:
+        """Exchange an app JWT for an installation access token."""
+        # Calls authenticated with the app JWT share the app's own rate limit
+        return await self._request(
+            "POST", f"/app/installations/{installation_id}/access_tokens", jwt_token, scheme="Bearer",
+            rate_key="app", endpoint=TOKEN_EXCHANGE
+        )
+
+    async def create_issue_comment(self, token: str, owner: str, repo: str, number: int, body: str,
+                                   installation_id: Optional[int] = None,
+                                   idempotency_key: Optional[str] = None, check_existing: bool = False,
+                                   max_wait: Optional[float] = None) -> Dict:
+        """Post a comment on an issue in a single request, without looking up the repo or issue first.
+
+        With an `idempotency_key`, the comment carries it in a hidden marker and
+        a retry after an ambiguous failure returns the already posted comment.
+        `check_existing` looks for it before the first attempt too, for work
+        resumed after an earlier call was cut short. `max_wait` caps how long
+        the comment waits for a rate-limit slot before `RateLimitExceeded`.
+        """
+        url = f"/repos/{owner}/{repo}/issues/{number}/comments"
+        rate_key = installation_id if installation_id is not None else owner
+        find_existing = None
+        if idempotency_key is not None:
+            marker = f"<!-- {COMMENT_MARKER_PREFIX}{idempotency_key} -->"
+            body = f"{body}\n\n{marker}"
+
+            async def find_comment():
+                response = await self._send("GET", url, token, "token", rate_key, COMMENTS, max_wait,
+                                            params={"per_page": 100})
+                response.raise_for_status()
+                for comment in response.json():
+                    if marker in (comment.get("body") or ""):
+                        return comment
+                return None
+
+            find_existing = find_comment
+        return await self._request("POST", url, token, json={"body": body}, rate_key=rate_key,
+                                   endpoint=COMMENTS, find_existing=find_existing, maybe_applied=check_existing,
+                                   max_wait=max_wait)
+
+    def stats(self) -> Dict:
+        """Connection reuse counters for the metrics endpoint."""
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "deduplicated": self.deduplicated,
+            "connections_opened": self.connections_opened,
+            "reused": self.requests - self.connections_opened,
+            "handshake_ms": round(self.handshake_seconds * 1000, 1),
+            "http_versions": dict(self.http_versions),
+        }
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
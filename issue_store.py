@@ -0,0 +1,610 @@
+"""Storage for the issues shown on the dashboard."""
+import asyncio
+import base64
+import sqlite3
+import struct
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from json_backend import dumps, loads
+from search_index import MIN_PREFIX_LENGTH, TITLE_WEIGHT, InvertedIndex, tokenize
+
+
+class IssueRecord:
+    """Compact representation of one stored issue.
+
+    Strings that repeat across issues (repository, user, avatar URL, labels) are
+    interned so every record shares one copy, the timestamp is kept as epoch
+    seconds, and the issue URL is only stored when it differs from the one
+    GitHub derives from the repository and number.
+    """
+
+    __slots__ = (
+        "number", "title", "body", "repository", "user", "user_avatar",
+        "_url", "created_at", "timestamp", "labels", "seq",
+    )
+
+    def __init__(self, number: int, title: Optional[str], body: str, repository: str,
+                 user: Optional[str], user_avatar: Optional[str], url: Optional[str],
+                 created_at: Optional[str], timestamp: float, labels: Tuple[str, ...], seq: int = 0):
+        self.number = number
+        self.title = title
+        self.body = body
+        self.repository = _intern(repository)
+        self.user = _intern(user)
+        self.user_avatar = _intern(user_avatar)
+        self._url = None if url == _issue_url(self.repository, number) else url
+        self.created_at = created_at
+        self.timestamp = timestamp
+        self.labels = tuple(_intern(label) for label in labels)
+        # Assigned by the store; breaks ties between equal timestamps in the ordering
+        self.seq = seq
+
+    @property
+    def url(self) -> str:
+        return self._url or _issue_url(self.repository, self.number)
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict:
+        """The JSON shape served by `/api/issues`, optionally projected onto `fields`."""
+        if fields is None:
+            fields = ISSUE_FIELDS
+        return {field: _FIELD_GETTERS[field](self) for field in fields}
+
+
+# Public fields of an issue, in response order
+ISSUE_FIELDS = (
+    "number", "title", "body", "repository", "user", "user_avatar",
+    "url", "created_at", "timestamp", "labels",
+)
+
+_FIELD_GETTERS = {
+    "number": lambda issue: issue.number,
+    "title": lambda issue: issue.title,
+    "body": lambda issue: issue.body,
+    "repository": lambda issue: issue.repository,
+    "user": lambda issue: issue.user,
+    "user_avatar": lambda issue: issue.user_avatar,
+    "url": lambda issue: issue.url,
+    "created_at": lambda issue: issue.created_at,
+    "timestamp": lambda issue: datetime.fromtimestamp(issue.timestamp).isoformat(),
+    "labels": lambda issue: list(issue.labels),
+}
+
+
+def encode_cursor(issue: IssueRecord) -> str:
+    """Opaque pagination cursor pointing just past `issue` in newest-first order."""
+    return base64.urlsafe_b64encode(struct.pack(">dq", issue.timestamp, issue.seq)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor into its (timestamp, seq) key; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return struct.unpack(">dq", raw)
+    except (ValueError, struct.error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _new_epoch() -> int:
+    """Starting version for a new store: the current time in microseconds.
+
+    Versions then keep increasing across restarts (a store never holds more
+    than one issue per microsecond of uptime), so a version handed out
+    before a restart is always older than the new store's `epoch`.
+    """
+    return time.time_ns() // 1000
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def _issue_url(repository: str, number: int) -> str:
+    return f"https://github.com/{repository}/issues/{number}"
+
+
+class IssueFilter:
+    """Server-side filters for issue queries; unset attributes match everything.
+
+    `q` matches issues whose title, body, repository or user contain every
+    word of it, the last one also as a prefix (as in `IssueStore.search`);
+    `since`/`until` bound the stored timestamp (epoch seconds).
+    """
+
+    __slots__ = ("q", "repository", "user", "label", "since", "until", "_terms")
+
+    def __init__(self, q: Optional[str] = None, repository: Optional[str] = None, user: Optional[str] = None,
+                 label: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None):
+        self.q = q or None
+        self.repository = repository or None
+        self.user = user or None
+        self.label = label or None
+        self.since = since
+        self.until = until
+        self._terms = list(dict.fromkeys(tokenize(q))) if q else None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) is not None for name in ("q", "repository", "user", "label", "since", "until"))
+
+    def matches(self, issue: IssueRecord, text: bool = True) -> bool:
+        """Evaluate the filter against one issue; `text=False` skips `q` for issues already matched by an index."""
+        if self.repository is not None and issue.repository != self.repository:
+            return False
+        if self.user is not None and issue.user != self.user:
+            return False
+        if self.label is not None and self.label not in issue.labels:
+            return False
+        if self.since is not None and issue.timestamp < self.since:
+            return False
+        if self.until is not None and issue.timestamp > self.until:
+            return False
+        if text and self._terms is not None:
+            return _contains_terms(issue, self._terms)
+        return True
+
+
+def _contains_terms(issue: IssueRecord, terms: List[str]) -> bool:
+    """Whether the issue's text contains every term, the last one also as a prefix."""
+    if not terms:
+        return False
+    tokens = set()
+    for text in (issue.title, issue.body, issue.repository, issue.user):
+        tokens.update(tokenize(text))
+    *words, last = terms
+    if any(word not in tokens for word in words):
+        return False
+    if last in tokens:
+        return True
+    return len(last) >= MIN_PREFIX_LENGTH and any(token.startswith(last) for token in tokens)
+
+
+class IssueStore:
+    """Interface of the storage backends behind the dashboard."""
+
+    def add(self, issue: IssueRecord) -> None:
+        """Store a newly opened issue."""
+        raise NotImplementedError
+
+    def recent(self, limit: Optional[int] = None) -> List[IssueRecord]:
+        """The most recent issues, newest first."""
+        raise NotImplementedError
+
+    def page(self, limit: int, before: Optional[Tuple[float, int]] = None,
+             filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Up to `limit` issues matching `filters`, ordered by (timestamp, seq) descending,
+        strictly older than `before`."""
+        raise NotImplementedError
+
+    def newer_than(self, seq: int, limit: int, filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Up to `limit` issues matching `filters` stored after the one with `seq`, newest first."""
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int,
+               filters: Optional[IssueFilter] = None) -> List[Tuple[IssueRecord, float]]:
+        """Up to `limit` (issue, score) pairs whose title, body, repository or user contain
+        every word of `query` (the last one as a prefix) and match `filters`, best match first."""
+        raise NotImplementedError
+
+    def has_issue(self, repository: str, number: int) -> bool:
+        """Whether the issue is stored (used when replaying events that may have been processed)."""
+        raise NotImplementedError
+
+    @property
+    def version(self) -> int:
+        """Seq of the most recently stored issue; changes whenever the stored set does."""
+        raise NotImplementedError
+
+    @property
+    def epoch(self) -> int:
+        """Version of the empty store; lower versions come from before a restart (or another database)."""
+        raise NotImplementedError
+
+    @property
+    def last_modified(self) -> Optional[float]:
+        """Timestamp of the most recently stored issue, None when empty."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+class MemoryIssueStore(IssueStore):
+    """Fixed-capacity ring buffer of recent issues.
+
+    Appends are O(1); once full, each new issue evicts the oldest one. Reads
+    return a snapshot copy, so a response being serialized never observes an
+    issue stored concurrently by the webhook handler. Issue text is kept in
+    an inverted index that follows the evictions.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self._issues: deque = deque(maxlen=capacity)
+        self._epoch = _new_epoch()
+        self._next_seq = self._epoch + 1
+        self._index = InvertedIndex()
+
+    @property
+    def capacity(self) -> int:
+        return self._issues.maxlen
+
+    def add(self, issue: IssueRecord) -> None:
+        """Store an issue, evicting the oldest one when full."""
+        issue.seq = self._next_seq
+        self._next_seq += 1
+        self._issues.append(issue)
+        self._index.discard_before(self._issues[0].seq)
+        self._index.add(issue.seq, issue.title, issue.body, issue.repository, issue.user)
+
+    def recent(self, limit: Optional[int] = None) -> List[IssueRecord]:
+        """A snapshot of the stored issues, newest first."""
+        return list(islice(reversed(self._issues), limit))
+
+    def page(self, limit: int, before: Optional[Tuple[float, int]] = None,
+             filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Keyset page, newest first.
+
+        Issues are timestamped as they are stored, so insertion order is the
+        (timestamp, seq) order and seqs are contiguous: the cursor position is
+        found by arithmetic instead of a scan. `q` is answered by the inverted
+        index, and the other filters are evaluated while walking back from
+        there, stopping early once past `since`.
+        """
+        if not self._issues:
+            return []
+        if filters and filters.q is not None:
+            candidates = self._text_matches(filters.q, before=before[1] if before is not None else None)
+        else:
+            offset = max(0, self._issues[-1].seq - before[1] + 1) if before is not None else 0
+            candidates = islice(reversed(self._issues), offset, None)
+            if not filters:
+                return list(islice(candidates, limit))
+        
+        issues = []
+        for issue in candidates:
+            if filters.since is not None and issue.timestamp < filters.since:
+                break
+            if filters.matches(issue, text=False):
+                issues.append(issue)
+                if len(issues) == limit:
+                    break
+        return issues
+
+    def newer_than(self, seq: int, limit: int, filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Delta since `seq`; seqs are contiguous, so only the newer issues are visited."""
+        if filters and filters.q is not None and self._issues:
+            candidates = self._text_matches(filters.q, after=seq)
+        else:
+            candidates = islice(reversed(self._issues), max(0, self.version - seq))
+        if filters:
+            candidates = (issue for issue in candidates if filters.matches(issue, text=False))
+        return list(islice(candidates, limit))
+
+    def _text_matches(self, query: str, before: Optional[int] = None,
+                      after: Optional[int] = None) -> Iterator[IssueRecord]:
+        """Issues containing the words of `query`, newest first, with seqs between `after` and `before` (exclusive).
+
+        The index returns matching seqs in ascending order; seqs are contiguous,
+        so each maps to its buffer position by arithmetic.
+        """
+        seqs = self._index.matching(query)
+        end = bisect_left(seqs, before) if before is not None else len(seqs)
+        start = bisect_right(seqs, after) if after is not None else 0
+        newest = self._issues[-1].seq
+        return (self._issues[seqs[index] - newest - 1] for index in range(end - 1, start - 1, -1))
+
+    def search(self, query: str, limit: int,
+               filters: Optional[IssueFilter] = None) -> List[Tuple[IssueRecord, float]]:
+        """Ranked full-text search over the buffered issues."""
+        if not self._issues:
+            return []
+        newest = self._issues[-1].seq
+        ranked = self._index.search(query, None if filters else limit)
+        results = []
+        for seq, score in ranked:
+            issue = self._issues[seq - newest - 1]
+            if filters and not filters.matches(issue):
+                continue
+            results.append((issue, score))
+            if len(results) == limit:
+                break
+        return results
+
+    def has_issue(self, repository: str, number: int) -> bool:
+        """Linear scan; only replays after a restart ask, when the buffer is nearly empty."""
+        return any(issue.number == number and issue.repository == repository for issue in self._issues)
+
+    @property
+    def version(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    @property
+    def last_modified(self) -> Optional[float]:
+        return self._issues[-1].timestamp if self._issues else None
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    seq INTEGER PRIMARY KEY,
+    number INTEGER NOT NULL,
+    title TEXT,
+    body TEXT,
+    repository TEXT NOT NULL,
+    user TEXT,
+    user_avatar TEXT,
+    url TEXT,
+    created_at TEXT,
+    timestamp REAL NOT NULL,
+    labels TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issue_labels (
+    seq INTEGER NOT NULL,
+    label TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issues_timestamp ON issues (timestamp, seq);
+CREATE INDEX IF NOT EXISTS idx_issues_repository ON issues (repository, timestamp);
+CREATE INDEX IF NOT EXISTS idx_issues_user ON issues (user, timestamp);
+CREATE INDEX IF NOT EXISTS idx_issue_labels_label ON issue_labels (label, seq);
+CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5 (
+    title, body, repository, user, content='issues', content_rowid='seq', prefix='2 3'
+);
+"""
+
+_ISSUE_COLUMNS = "number, title, body, repository, user, user_avatar, url, created_at, timestamp, labels"
+
+
+class SQLiteIssueStore(IssueStore):
+    """Persistent issue history in SQLite (WAL mode), kept indefinitely.
+
+    Writes are buffered and inserted in batches: when `batch_size` issues are
+    pending, `flush_interval` seconds after the first pending one, or before
+    any read. Repository, user, timestamp and label lookups are indexed, and
+    issue text goes into an FTS5 full-text index in the same transaction.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'issues_fts'"
+        ).fetchone()
+        self._conn.executescript(SQLITE_SCHEMA)
+        if not has_fts:
+            # History written before the full-text index existed
+            with self._conn:
+                self._conn.execute("INSERT INTO issues_fts (issues_fts) VALUES ('rebuild')")
+        self._count, first_seq, last_seq, self._last_timestamp = self._conn.execute(
+            "SELECT COUNT(*), MIN(seq), MAX(seq), MAX(timestamp) FROM issues"
+        ).fetchone()
+        # History persists across restarts, so the epoch only changes with the database
+        self._epoch = first_seq - 1 if first_seq is not None else _new_epoch()
+        self._next_seq = (last_seq or self._epoch) + 1
+        self._pending: List[IssueRecord] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def add(self, issue: IssueRecord) -> None:
+        """Buffer an issue for the next batched insert."""
+        issue.seq = self._next_seq
+        self._next_seq += 1
+        self._pending.append(issue)
+        self._count += 1
+        self._last_timestamp = issue.timestamp
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # No event loop (scripts, benchmarks): flushed by size or on read
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self) -> None:
+        """Insert all pending issues in one transaction."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        issue_rows = []
+        label_rows = []
+        text_rows = []
+        for issue in pending:
+            seq = issue.seq
+            issue_rows.append((
+                seq, issue.number, issue.title, issue.body, issue.repository, issue.user,
+                issue.user_avatar, issue._url, issue.created_at, issue.timestamp, dumps(list(issue.labels))
+            ))
+            label_rows.extend((seq, label) for label in issue.labels)
+            text_rows.append((seq, issue.title, issue.body, issue.repository, issue.user))
+        with self._conn:
+            self._conn.executemany(f"INSERT INTO issues (seq, {_ISSUE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", issue_rows)
+            self._conn.executemany("INSERT INTO issue_labels (seq, label) VALUES (?, ?)", label_rows)
+            self._conn.executemany("INSERT INTO issues_fts (rowid, title, body, repository, user) VALUES (?, ?, ?, ?, ?)", text_rows)
+
+    def recent(self, limit: Optional[int] = None) -> List[IssueRecord]:
+        """The most recent issues, newest first."""
+        self.flush()
+        rows = self._conn.execute(
+            f"SELECT {_ISSUE_COLUMNS}, seq FROM issues ORDER BY timestamp DESC, seq DESC LIMIT ?",
+            (limit if limit is not None else -1,)
+        ).fetchall()
+        return [_record_from_row(row) for row in rows]
+
+    def page(self, limit: int, before: Optional[Tuple[float, int]] = None,
+             filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Keyset page, newest first.
+
+        Repository, user and label filters and the time range are answered from
+        their indexes, and `q` from the full-text index.
+        """
+        self.flush()
+        if filters and filters.q is not None:
+            return self._text_matches(filters, limit, "rowid < ?", before[1] if before is not None else None)
+        clauses = []
+        params: list = []
+        if before is not None:
+            clauses.append("(timestamp, seq) < (?, ?)")
+            params.extend(before)
+        if filters:
+            _filter_clauses(filters, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT {_ISSUE_COLUMNS}, seq FROM issues {where}ORDER BY timestamp DESC, seq DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [_record_from_row(row) for row in rows]
+
+    def newer_than(self, seq: int, limit: int, filters: Optional[IssueFilter] = None) -> List[IssueRecord]:
+        """Delta since `seq`, read from the primary key."""
+        self.flush()
+        if filters and filters.q is not None:
+            return self._text_matches(filters, limit, "rowid > ?", seq)
+        clauses = ["seq > ?"]
+        params: list = [seq]
+        if filters:
+            _filter_clauses(filters, clauses, params)
+        rows = self._conn.execute(
+            f"SELECT {_ISSUE_COLUMNS}, seq FROM issues WHERE {' AND '.join(clauses)} ORDER BY seq DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [_record_from_row(row) for row in rows]
+
+    def _text_matches(self, filters: IssueFilter, limit: int, bound: str,
+                      seq: Optional[int]) -> List[IssueRecord]:
+        """Issues matching `filters.q` (and the other filters), newest first, with rowids within `bound` of `seq`.
+
+        FTS5 hands out matches in descending rowid order, so a page stops after
+        `limit` matches instead of sorting them all. Issues are stored in
+        timestamp order, so this is also the (timestamp, seq) order.
+        """
+        match = _fts_query(filters.q)
+        if match is None:
+            return []
+        params: list = [match]
+        if seq is not None:
+            match_clause = f"issues_fts MATCH ? AND {bound}"
+            params.append(seq)
+        else:
+            match_clause = "issues_fts MATCH ?"
+        clauses = []
+        _filter_clauses(filters, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT {_ISSUE_COLUMNS}, seq FROM (SELECT rowid AS match_seq FROM issues_fts WHERE {match_clause}) "
+            f"JOIN issues ON seq = match_seq {where}ORDER BY match_seq DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [_record_from_row(row) for row in rows]
+
+    def search(self, query: str, limit: int,
+               filters: Optional[IssueFilter] = None) -> List[Tuple[IssueRecord, float]]:
+        """Ranked full-text search using FTS5's BM25, with titles weighted as in the memory index."""
+        match = _fts_query(query)
+        if match is None:
+            return []
+        self.flush()
+        clauses = []
+        params: list = [match]
+        if filters:
+            _filter_clauses(filters, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT {_ISSUE_COLUMNS}, seq, score FROM issues JOIN ("
+            f"SELECT rowid AS match_seq, -bm25(issues_fts, {float(TITLE_WEIGHT)}, 1.0, 1.0, 1.0) AS score "
+            f"FROM issues_fts WHERE issues_fts MATCH ?"
+            f") ON seq = match_seq {where}ORDER BY score DESC, seq DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [(_record_from_row(row[:-1]), row[-1]) for row in rows]
+
+    def has_issue(self, repository: str, number: int) -> bool:
+        """Looked up through the repository index."""
+        self.flush()
+        return self._conn.execute(
+            "SELECT 1 FROM issues WHERE repository = ? AND number = ? LIMIT 1", (repository, number)
+        ).fetchone() is not None
+
+    @property
+    def version(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    @property
+    def last_modified(self) -> Optional[float]:
+        return self._last_timestamp
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        self.flush()
+        self._conn.close()
+
+
+def _filter_clauses(filters: IssueFilter, clauses: List[str], params: list) -> None:
+    """Append the conditions of `filters` except `q` (matched through `issues_fts`) to a WHERE clause under construction."""
+    if filters.repository is not None:
+        clauses.append("repository = ?")
+        params.append(filters.repository)
+    if filters.user is not None:
+        clauses.append("user = ?")
+        params.append(filters.user)
+    if filters.label is not None:
+        clauses.append("seq IN (SELECT seq FROM issue_labels WHERE label = ?)")
+        params.append(filters.label)
+    if filters.since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(filters.since)
+    if filters.until is not None:
+        clauses.append("timestamp <= ?")
+        params.append(filters.until)
+
+
+def _fts_query(query: str) -> Optional[str]:
+    """FTS5 MATCH expression equivalent to `InvertedIndex.search`; None if there is nothing to match."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return None
+    phrases = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+def _record_from_row(row: tuple) -> IssueRecord:
+    number, title, body, repository, user, user_avatar, url, created_at, timestamp, labels, seq = row
+    return IssueRecord(
+        number, title, body, repository, user, user_avatar, url, created_at, timestamp, tuple(loads(labels)), seq
+    )
+
+
+def create_issue_store(backend: str, capacity: int, path: str) -> IssueStore:
+    """Build the storage backend selected by configuration (`memory` or `sqlite`)."""
+    if backend == "memory":
+        return MemoryIssueStore(capacity=capacity)
+    if backend == "sqlite":
+        return SQLiteIssueStore(path)
+    raise ValueError(f"Unknown issue store backend: {backend!r}")
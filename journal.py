@@ -0,0 +1,159 @@
+"""Durable on-disk journal of accepted webhook events (SQLite in WAL mode)."""
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    received_at REAL NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class WebhookJournal:
+    """Append-only journal that persists webhook deliveries before they are acknowledged.
+
+    Appends are group-committed: every append that arrives while a commit is in
+    flight is written by the next single transaction, so one fsync covers a
+    whole burst. All SQLite work runs on one dedicated thread. Completed entries
+    are marked done lazily and deleted once `compact_every` of them accumulate.
+    """
+
+    def __init__(self, path: str, max_batch: int = 512, compact_every: int = 1000):
+        self.path = path
+        self.max_batch = max_batch
+        self.compact_every = compact_every
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-journal")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[str, bytes, float, asyncio.Future]] = []
+        self._done_ids: List[int] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._done_since_compact = 0
+        self.appended = 0
+        self.commits = 0
+        self.append_batches = 0
+        self.commit_seconds = 0.0
+        self.compactions = 0
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def open(self) -> None:
+        """Open (or create) the journal database."""
+        await self._run(self._open)
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL makes every commit fsync the WAL, so acknowledged events survive power loss
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute(SCHEMA)
+        self._conn = conn
+
+    async def close(self) -> None:
+        """Flush outstanding writes and close the database."""
+        if self._writer is not None:
+            await self._writer
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+    async def append(self, event: str, payload: bytes) -> int:
+        """Durably store an event and return its journal id once committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((event, payload, time.time(), future))
+        self._ensure_writer()
+        return await future
+
+    def mark_done(self, entry_id: int) -> None:
+        """Mark an entry as processed; written with the next commit."""
+        self._done_ids.append(entry_id)
+        self._ensure_writer()
+
+    async def pending_events(self) -> List[Tuple[int, str, bytes]]:
+        """Entries that were accepted but never marked done, oldest first."""
+        return await self._run(self._select_pending)
+
+    def _select_pending(self) -> List[Tuple[int, str, bytes]]:
+        return self._conn.execute(
+            "SELECT id, event, payload FROM webhook_events WHERE done = 0 ORDER BY id"
+        ).fetchall()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        try:
+            while self._pending or self._done_ids:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                done_ids, self._done_ids = self._done_ids, []
+                try:
+                    ids = await self._run(self._commit, [entry[:3] for entry in batch], done_ids)
+                except Exception as e:
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for entry_id, (*_, future) in zip(ids, batch):
+                    if not future.done():
+                        future.set_result(entry_id)
+        finally:
+            self._writer = None
+
+    def _commit(self, rows: List[Tuple[str, bytes, float]], done_ids: List[int]) -> List[int]:
+        started = time.perf_counter()
+        conn = self._conn
+        ids = []
+        conn.execute("BEGIN")
+        try:
+            for event, payload, received_at in rows:
+                cursor = conn.execute(
+                    "INSERT INTO webhook_events (event, payload, received_at) VALUES (?, ?, ?)",
+                    (event, payload, received_at)
+                )
+                ids.append(cursor.lastrowid)
+            if done_ids:
+                conn.executemany("UPDATE webhook_events SET done = 1 WHERE id = ?", [(i,) for i in done_ids])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self.appended += len(rows)
+        self.commits += 1
+        if rows:
+            self.append_batches += 1
+        self.commit_seconds += time.perf_counter() - started
+        self._done_since_compact += len(done_ids)
+        if self._done_since_compact >= self.compact_every:
+            self._compact()
+        return ids
+
+    async def compact(self) -> None:
+        """Delete completed entries and truncate the WAL."""
+        await self._run(self._compact)
+
+    def _compact(self) -> None:
+        self._conn.execute("DELETE FROM webhook_events WHERE done = 1")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._done_since_compact = 0
+        self.compactions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        return {
+            "appended": self.appended,
+            "commits": self.commits,
+            "avg_append_batch": round(self.appended / self.append_batches, 2) if self.append_batches else 0.0,
+            "avg_commit_ms": round(self.commit_seconds / self.commits * 1000, 3) if self.commits else 0.0,
+            "pending_appends": len(self._pending),
+            "compactions": self.compactions,
+        }
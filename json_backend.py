@@ -0,0 +1,43 @@
+"""JSON encoding/decoding with an optional fast backend.
+
+orjson or msgspec are used when installed; otherwise the stdlib `json` module.
+Both functions work on bytes so payloads are never round-tripped through str.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+    loads = _decoder.decode
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes."""
+        return _encoder.encode(obj)
+
+else:
+    BACKEND = "json"
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
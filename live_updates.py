@@ -0,0 +1,248 @@
+"""Fan-out of live dashboard updates to long-lived streaming connections."""
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from json_backend import dumps
+
+
+def sse_event(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Encode one Server-Sent Events frame with a JSON payload."""
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{frame}event: {event}\ndata: ".encode("utf-8") + dumps(data) + b"\n\n"
+
+
+class _Subscription:
+    """Where one subscriber is in the chain; the only reference it holds to unsent messages."""
+
+    __slots__ = ("future", "position")
+
+    def __init__(self, future: asyncio.Future, position: int):
+        self.future: Optional[asyncio.Future] = future
+        # Index of the last message handed to the subscriber
+        self.position = position
+
+
+class Broadcast:
+    """Single-producer, many-consumer chain of pre-encoded messages.
+
+    Every subscriber awaits the same future; publishing resolves it with the
+    message and the future of the next one. A publish therefore costs one
+    future however many clients are connected, idle clients are just
+    suspended coroutines with a two-slot position record (no per-client
+    queues, timers or polling), and each message is encoded once for all of
+    them. Every `max_lag` publishes, subscribers more than `max_lag` messages
+    behind are cut off, so a client stuck in a blocked send cannot pin the
+    chain; it ends when it resumes.
+    """
+
+    def __init__(self, max_lag: int = 1000):
+        self.max_lag = max_lag
+        self._next: Optional[asyncio.Future] = None
+        self._subscriptions: Set[_Subscription] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._closed = False
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> AsyncIterator[bytes]:
+        """Messages published from now on; ends when the broadcast is closed."""
+        if self._next is None:
+            self._next = asyncio.get_running_loop().create_future()
+            if self._closed:
+                self._next.set_result(None)
+        return self._follow(_Subscription(self._next, self.published))
+
+    async def _follow(self, subscription: _Subscription) -> AsyncIterator[bytes]:
+        self._subscriptions.add(subscription)
+        try:
+            while subscription.future is not None:
+                # Shielded: a disconnecting client must not cancel the future everyone shares
+                link = await asyncio.shield(subscription.future)
+                if link is None:
+                    return
+                subscription.position, message, subscription.future = link
+                # Only `subscription` may refer to the rest of the chain while the message is sent
+                del link
+                yield message
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def _drop_lagging(self) -> None:
+        """Cut off subscribers more than `max_lag` messages behind, releasing the messages they pin."""
+        oldest = self.published - self.max_lag
+        for subscription in self._subscriptions:
+            if subscription.position < oldest and subscription.future is not None:
+                subscription.future = None
+                self.dropped += 1
+
+    def publish(self, message: bytes) -> None:
+        """Deliver a message to every current subscriber."""
+        self.published += 1
+        if self.published % self.max_lag == 0 and self._subscriptions:
+            self._drop_lagging()
+        future = self._next
+        if future is None or future.done():
+            # Nobody has subscribed since the last publish
+            self._next = None
+            return
+        self._next = future.get_loop().create_future()
+        future.set_result((self.published, message, self._next))
+
+    def start_heartbeat(self, message: bytes, interval: float) -> None:
+        """Publish `message` every `interval` seconds while anyone is subscribed (keeps proxies from timing out)."""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.ensure_future(self._beat(message, interval))
+
+    async def _beat(self, message: bytes, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self.subscribers:
+                self.publish(message)
+
+    def close(self) -> None:
+        """End every subscription."""
+        self._closed = True
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._next is not None and not self._next.done():
+            self._next.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+class Outbox:
+    """Bounded send buffer of one push client.
+
+    Ordered messages (new issues) are queued up to `maxsize`; beyond that the
+    oldest are dropped and the next drain starts with `overflow_message` so
+    the client can resynchronize. Snapshot messages (stats) are coalesced:
+    only the latest of each kind is kept. Either way a stalled client holds
+    at most `maxsize` messages plus one per kind.
+    """
+
+    __slots__ = ("maxsize", "overflow_message", "_messages", "_latest", "_ready", "overflowed", "dropped", "closed")
+
+    def __init__(self, maxsize: int, overflow_message: str):
+        self.maxsize = maxsize
+        self.overflow_message = overflow_message
+        self._messages: deque = deque()
+        self._latest: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, message: str) -> None:
+        """Queue a message, dropping the oldest queued one when full."""
+        if len(self._messages) >= self.maxsize:
+            self._messages.popleft()
+            self.dropped += 1
+            self.overflowed = True
+        self._messages.append(message)
+        self._ready.set()
+
+    def replace(self, kind: str, message: str) -> None:
+        """Set the pending snapshot of `kind`, superseding an unsent one."""
+        self._latest[kind] = message
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def drain(self) -> List[str]:
+        """Wait for messages and take all of them; empty once closed."""
+        await self._ready.wait()
+        self._ready.clear()
+        if self.closed:
+            return []
+        batch = [self.overflow_message] if self.overflowed else []
+        self.overflowed = False
+        batch.extend(self._messages)
+        batch.extend(self._latest.values())
+        self._messages.clear()
+        self._latest.clear()
+        return batch
+
+
+class PushHub:
+    """Registry of connected push clients, each with its own bounded `Outbox`.
+
+    Publishing only appends the (once-encoded) message to every outbox; the
+    sockets are written by each connection's own sender, so a slow client
+    delays nobody else and costs at most its buffer.
+    """
+
+    def __init__(self, buffer_size: int = 64, overflow_message: str = '{"type":"resync"}'):
+        self.buffer_size = buffer_size
+        self.overflow_message = overflow_message
+        self._clients: Set[Outbox] = set()
+        self._ticker: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+        # Clients disconnected for not reading at all, counted by the connection handler
+        self.stalled = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def connect(self) -> Outbox:
+        outbox = Outbox(self.buffer_size, self.overflow_message)
+        self._clients.add(outbox)
+        return outbox
+
+    def disconnect(self, outbox: Outbox) -> None:
+        self._clients.discard(outbox)
+        self.dropped += outbox.dropped
+        outbox.close()
+
+    def publish(self, message: str) -> None:
+        """Queue an ordered message for every client."""
+        self.published += 1
+        for outbox in self._clients:
+            outbox.put(message)
+
+    def publish_latest(self, kind: str, message: str) -> None:
+        """Offer every client a snapshot that replaces any unsent one of the same kind."""
+        for outbox in self._clients:
+            outbox.replace(kind, message)
+
+    def start_ticker(self, kind: str, snapshot: Callable[[], str], interval: float) -> None:
+        """Publish `snapshot()` as a `kind` snapshot every `interval` seconds while clients are connected."""
+        if self._ticker is None:
+            self._ticker = asyncio.ensure_future(self._tick(kind, snapshot, interval))
+
+    async def _tick(self, kind: str, snapshot: Callable[[], str], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self._clients:
+                self.publish_latest(kind, snapshot())
+
+    def close(self) -> None:
+        """Stop the ticker and end every client's sender."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        for outbox in list(self._clients):
+            self.disconnect(outbox)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "clients": len(self._clients),
+            "published": self.published,
+            "dropped": self.dropped + sum(outbox.dropped for outbox in self._clients),
+            "stalled": self.stalled,
+        }
@@ -0,0 +1,154 @@
+"""Per-installation pacing of GitHub requests driven by GitHub's rate-limit headers."""
+import asyncio
+import time
+from typing import Dict, Hashable, Mapping, Optional
+
+# GitHub asks clients that hit a secondary rate limit without a Retry-After to wait at least a minute
+SECONDARY_LIMIT_BACKOFF = 60.0
+# Below this fraction of the primary limit, requests are spread over the rest of its window
+LOW_BUDGET_FRACTION = 0.1
+
+
+class RateLimitExceeded(Exception):
+    """A request would have to wait longer than allowed for GitHub's rate limit to clear."""
+
+    def __init__(self, key: Hashable, retry_in: float):
+        super().__init__(f"GitHub rate limit for {key} clears in {retry_in:.0f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+class _Budget:
+    """Pacing state of one installation (or of the app itself, for JWT calls)."""
+
+    __slots__ = ("next_at", "blocked_until", "limit", "remaining", "reset_at", "waiting",
+                 "requests", "throttled", "wait_seconds")
+
+    def __init__(self):
+        # GCRA theoretical arrival time: when the bucket would be empty again
+        self.next_at = 0.0
+        self.blocked_until = 0.0
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+
+class RateLimitScheduler:
+    """Token bucket per installation, paced by what GitHub reports.
+
+    Each key may send `burst` requests at once and `rate` per second after
+    that (a `rate` of 0 disables pacing and only follows GitHub's headers).
+    When `X-RateLimit-Remaining` falls below a tenth of the limit, the rate
+    drops further so the rest lasts until `X-RateLimit-Reset`. A rate-limited
+    response (remaining 0, `Retry-After`, or a secondary limit) blocks the key
+    until GitHub says to retry. Callers wait their turn in order instead of
+    failing, but never longer than `max_wait` seconds; a longer wait raises
+    `RateLimitExceeded` with the time until the slot, to be retried later.
+    """
+
+    def __init__(self, rate: float = 80 / 60, burst: int = 20, max_wait: float = 300.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._budgets: Dict[Hashable, _Budget] = {}
+
+    def _budget(self, key: Hashable) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget()
+        return budget
+
+    def _interval(self, budget: _Budget, at: float) -> float:
+        """Spacing of requests sent at `at`."""
+        interval = 1 / self.rate if self.rate > 0 else 0.0
+        if (budget.remaining is not None and budget.limit and budget.reset_at is not None
+                and budget.remaining < budget.limit * LOW_BUDGET_FRACTION and budget.reset_at > at):
+            interval = max(interval, (budget.reset_at - at) / max(budget.remaining, 1))
+        return interval
+
+    async def acquire(self, key: Hashable, max_wait: Optional[float] = None) -> None:
+        """Wait for the key's next request slot.
+
+        Raises `RateLimitExceeded` if that would take longer than `max_wait`
+        (the scheduler's own by default), without taking the slot.
+        """
+        if max_wait is None:
+            max_wait = self.max_wait
+        budget = self._budget(key)
+        budget.requests += 1
+        while True:
+            now = time.time()
+            blocked_until = budget.blocked_until
+            start = max(budget.next_at, now, blocked_until)
+            interval = self._interval(budget, start)
+            delay = max(0.0, start - interval * (self.burst - 1) - now, blocked_until - now)
+            if delay > max_wait:
+                raise RateLimitExceeded(key, delay)
+            budget.next_at = start + interval
+            if delay == 0:
+                return
+            budget.throttled += 1
+            budget.wait_seconds += delay
+            budget.waiting += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                budget.waiting -= 1
+            if budget.blocked_until == blocked_until:
+                return
+            # Rate limited while this request waited: queue up again behind the block
+
+    def update(self, key: Hashable, status_code: int, headers: Mapping[str, str], body: bytes = b"") -> bool:
+        """Record a response's rate-limit headers; returns True if it was rate limited (and the key is now blocked)."""
+        budget = self._budget(key)
+        now = time.time()
+        limit = headers.get("x-ratelimit-limit")
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        try:
+            if limit is not None:
+                budget.limit = int(limit)
+            if remaining is not None:
+                budget.remaining = int(remaining)
+            if reset is not None:
+                budget.reset_at = float(reset)
+        except ValueError:
+            pass
+
+        if status_code not in (403, 429):
+            return False
+        retry_after = headers.get("retry-after")
+        if retry_after is not None and retry_after.isdigit():
+            until = now + int(retry_after)
+        elif budget.remaining == 0 and budget.reset_at is not None:
+            until = budget.reset_at
+        elif status_code == 429 or b"secondary rate limit" in body.lower():
+            until = now + SECONDARY_LIMIT_BACKOFF
+        else:
+            return False  # A plain permission error
+        if until > budget.blocked_until:
+            budget.blocked_until = until
+            # Resume at the steady rate rather than with a full burst
+            budget.next_at = max(budget.next_at, until + self._interval(budget, until) * (self.burst - 1))
+        return True
+
+    def stats(self) -> Dict[str, Dict]:
+        """Remaining budget and pacing gauges per key, for the metrics endpoint."""
+        now = time.time()
+        return {
+            str(key): {
+                "limit": budget.limit,
+                "remaining": budget.remaining,
+                "reset_in": max(0, int(budget.reset_at - now)) if budget.reset_at else None,
+                "blocked_for": round(max(0.0, budget.blocked_until - now), 1),
+                "waiting": budget.waiting,
+                "requests": budget.requests,
+                "throttled": budget.throttled,
+                "wait_seconds": round(budget.wait_seconds, 3),
+            }
+            for key, budget in self._budgets.items()
+        }
@@ -0,0 +1,126 @@
+"""Pre-encoded API response bodies, with compressed variants, for the current store version."""
+import gzip
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Smaller bodies are always sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def preferred_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best content coding we support that the Accept-Encoding header allows, or None."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    for encoding in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class CachedBody:
+    """One encoded response body; compressed variants are built on first request and kept."""
+
+    __slots__ = ("identity", "_variants")
+
+    def __init__(self, identity: bytes):
+        self.identity = identity
+        self._variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """The body in `encoding` (None for identity)."""
+        if encoding is None or len(self.identity) < MIN_COMPRESS_SIZE:
+            return self.identity
+        body = self._variants.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.identity, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.identity, compresslevel=GZIP_LEVEL, mtime=0)
+            self._variants[encoding] = body
+        return body
+
+    @property
+    def size(self) -> int:
+        return len(self.identity) + sum(len(body) for body in self._variants.values())
+
+
+class ResponseCache:
+    """LRU of encoded responses keyed by query string, valid for one store version.
+
+    Every write to the store bumps its version; the first lookup with a new
+    version drops all entries, so a cached body is never older than the data.
+    Between writes, repeated polls of the same query (the dashboard's
+    common case) skip the store query, dict building, JSON encoding and
+    compression entirely.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._version: Optional[int] = None
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, version: int, key: str) -> Optional[CachedBody]:
+        """The cached body for `key` at store `version`, if any."""
+        self._check_version(version)
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return cached
+
+    def put(self, version: int, key: str, body: bytes) -> CachedBody:
+        """Cache an encoded body for `key` at store `version` and return it."""
+        cached = CachedBody(body)
+        if self.max_entries <= 0:
+            return cached
+        self._check_version(version)
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(cached.size for cached in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,84 @@
+"""Bounded retries with exponential backoff, full jitter and a shared retry budget."""
+import random
+import time
+from typing import Dict, Optional
+
+# Transient GitHub responses worth another attempt
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class RetryBudget:
+    """Caps retries at a fraction of all requests (plus a small steady allowance).
+
+    Every request deposits `ratio` tokens and every retry spends one, so while
+    GitHub is down the bot adds at most `ratio` extra load instead of
+    multiplying it by the number of attempts. `min_per_second` tokens accrue
+    over time so a quiet bot can still retry its occasional failure.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+
+    def deposit(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for one retry; False when the budget is exhausted."""
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RetryPolicy:
+    """Up to `attempts` tries per request, spaced by full-jitter exponential backoff.
+
+    The n-th retry waits a random time up to `base_delay * 2**(n-1)`, capped at
+    `max_delay`, or longer if the response asked for it with Retry-After.
+    """
+
+    def __init__(self, attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8.0,
+                 budget: Optional[RetryBudget] = None):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.requests = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.budget_exhausted = 0
+
+    def start(self) -> None:
+        """Count a new request (not a retry) towards the budget."""
+        self.requests += 1
+        self.budget.deposit()
+
+    def next_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """Seconds to wait before retrying after failed `attempt` (1-based), or None to give up."""
+        if attempt >= self.attempts:
+            self.gave_up += 1
+            return None
+        if not self.budget.withdraw():
+            self.budget_exhausted += 1
+            return None
+        self.retries += 1
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_delay))
+        return delay
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "gave_up": self.gave_up,
+            "budget_exhausted": self.budget_exhausted,
+        }
@@ -0,0 +1,222 @@
+"""Incremental full-text inverted index over issue text (title, body, repository, user)."""
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Title matches count this many times more than body matches
+TITLE_WEIGHT = 2
+# Prefix expansion limits: shorter prefixes only match whole tokens
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 200
+# Rough cost of one binary-search probe relative to scoring one posting
+PROBE_COST = 16
+# Discarded entries a postings list may hold before they are cut off (when they are also the majority)
+MIN_TRIM = 32
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into case-folded word tokens."""
+    return TOKEN_RE.findall(text.casefold()) if text else []
+
+
+class _Postings:
+    """Documents containing one token: ascending ids with their weighted term counts."""
+
+    __slots__ = ("token", "ids", "weights", "start")
+
+    def __init__(self, token: str):
+        self.token = token
+        self.ids = array("q")
+        self.weights = array("H")
+        # Entries before `start` belong to documents that were discarded
+        self.start = 0
+
+
+class InvertedIndex:
+    """Token -> postings index with ranked, prefix-aware AND queries.
+
+    Documents must be added with increasing ids and are discarded oldest first
+    (as the ring buffer evicts them), so postings are append-only arrays whose
+    discarded documents are always at the front. Each document remembers the
+    postings it was added to, so discarding it touches only its own tokens and
+    forgets those no live document contains; memory follows the live documents.
+    Scores are the sum over query terms of weighted term count x IDF.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, _Postings] = {}
+        # Tokens by their first MIN_PREFIX_LENGTH characters, for prefix expansion
+        self._prefixes: Dict[str, Set[str]] = {}
+        # (doc_id, postings it appears in) of the live documents, oldest first
+        self._documents: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, doc_id: int, title: Optional[str], *fields: Optional[str]) -> None:
+        """Index a document's title and other text fields; ids must be larger than any previously added."""
+        counts = Counter(tokenize(title))
+        for token in counts:
+            counts[token] *= TITLE_WEIGHT
+        for text in fields:
+            counts.update(tokenize(text))
+        appears_in = []
+        for token, count in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = _Postings(token)
+                if len(token) >= MIN_PREFIX_LENGTH:
+                    self._prefixes.setdefault(token[:MIN_PREFIX_LENGTH], set()).add(token)
+            postings.ids.append(doc_id)
+            postings.weights.append(min(count, 0xFFFF))
+            appears_in.append(postings)
+        self._documents.append((doc_id, tuple(appears_in)))
+
+    def discard_before(self, doc_id: int) -> None:
+        """Forget every document with an id lower than `doc_id`."""
+        documents = self._documents
+        while documents and documents[0][0] < doc_id:
+            for postings in documents.popleft()[1]:
+                self._discard_first(postings)
+
+    def _discard_first(self, postings: _Postings) -> None:
+        """Drop the oldest live entry of a postings list, and the token once no document contains it."""
+        postings.start += 1
+        start = postings.start
+        if start == len(postings.ids):
+            token = postings.token
+            del self._postings[token]
+            if len(token) >= MIN_PREFIX_LENGTH:
+                key = token[:MIN_PREFIX_LENGTH]
+                tokens = self._prefixes[key]
+                tokens.discard(token)
+                if not tokens:
+                    del self._prefixes[key]
+        elif start > MIN_TRIM and start * 2 > len(postings.ids):
+            # Copies fewer live entries than were discarded since the last trim
+            del postings.ids[:start]
+            del postings.weights[:start]
+            postings.start = 0
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        if not prefix or len(term) < MIN_PREFIX_LENGTH:
+            return [term] if term in self._postings else []
+        tokens = self._prefixes.get(term[:MIN_PREFIX_LENGTH], ())
+        return heapq.nsmallest(MAX_PREFIX_EXPANSIONS, (token for token in tokens if token.startswith(term)))
+
+    def _groups(self, query: str) -> List["_Group"]:
+        """Live postings of each query term (the last one prefix-expanded); empty if any term has none."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        total = max(len(self), 1)
+        groups = []
+        for position, term in enumerate(terms):
+            group = []
+            for token in self._expand(term, prefix=position == len(terms) - 1):
+                postings = self._postings[token]
+                start = postings.start
+                live = len(postings.ids) - start
+                if live:
+                    group.append((postings, start, math.log(1 + total / live)))
+            if not group:
+                return []
+            groups.append(group)
+        return groups
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Tuple[int, float]]:
+        """Ranked (doc_id, score) matches containing every query term, best first.
+
+        The last term also matches as a prefix, for search-as-you-type. With
+        `limit=None` every match is returned, still ranked.
+        """
+        groups = self._groups(query)
+        if not groups:
+            return []
+
+        if len(groups) == 1 and len(groups[0]) == 1:
+            # One exact term: the weighted count alone decides the order
+            postings, start, idf = groups[0][0]
+            best = _top(zip(postings.weights[start:], postings.ids[start:]), limit)
+            return [(doc_id, weight * idf) for weight, doc_id in best]
+
+        scores = _intersect(groups)
+        # Ties go to the newest document
+        best = _top(((score, doc_id) for doc_id, score in scores.items()), limit)
+        return [(doc_id, score) for score, doc_id in best]
+
+    def matching(self, query: str) -> Sequence[int]:
+        """Ids of the documents containing every query term (the last also as a prefix), ascending and unranked."""
+        groups = self._groups(query)
+        if not groups:
+            return []
+        if len(groups) == 1 and len(groups[0]) == 1:
+            postings, start, _ = groups[0][0]
+            return postings.ids[start:]
+        return sorted(_intersect(groups))
+
+    def stats(self) -> Dict[str, int]:
+        """Size counters for the metrics endpoint."""
+        return {
+            "documents": len(self),
+            "tokens": len(self._postings),
+            "postings": sum(len(postings.ids) - postings.start for postings in self._postings.values()),
+        }
+
+
+_Group = List[Tuple[_Postings, int, float]]
+
+
+def _group_size(group: _Group) -> int:
+    return sum(len(postings.ids) - start for postings, start, _ in group)
+
+
+def _intersect(groups: List[_Group]) -> Dict[int, float]:
+    """Summed scores of the documents matching every group."""
+    # Start from the rarest term; probe the others per candidate while that is
+    # cheaper than scoring them in full and intersecting
+    groups = sorted(groups, key=_group_size)
+    scores = _score(groups[0])
+    for group in groups[1:]:
+        if len(scores) * PROBE_COST < _group_size(group):
+            scores = _probe(scores, group)
+        else:
+            other = _score(group)
+            scores = {doc_id: score + other[doc_id] for doc_id, score in scores.items() if doc_id in other}
+        if not scores:
+            break
+    return scores
+
+
+def _score(group: _Group) -> Dict[int, float]:
+    """Scores of every live document matching any token of the group."""
+    if len(group) == 1:
+        postings, start, idf = group[0]
+        return dict(zip(postings.ids[start:], [weight * idf for weight in postings.weights[start:]]))
+    scores: Dict[int, float] = {}
+    for postings, start, idf in group:
+        for doc_id, weight in zip(postings.ids[start:], postings.weights[start:]):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf
+    return scores
+
+
+def _probe(scores: Dict[int, float], group: _Group) -> Dict[int, float]:
+    """Keep the candidates that also match the group, adding its score."""
+    matched: Dict[int, float] = {}
+    for doc_id, score in scores.items():
+        extra = 0.0
+        for postings, start, idf in group:
+            index = bisect_left(postings.ids, doc_id, start)
+            if index < len(postings.ids) and postings.ids[index] == doc_id:
+                extra += postings.weights[index] * idf
+        if extra:
+            matched[doc_id] = score + extra
+    return matched
+
+
+def _top(ranked, limit: Optional[int]) -> list:
+    return heapq.nlargest(limit, ranked) if limit is not None else sorted(ranked, reverse=True)
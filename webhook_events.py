@@ -0,0 +1,209 @@
+"""Compact, typed views of the webhook payloads the bot acts on.
+
+Only the handful of fields the bot uses are extracted. When msgspec is
+installed the payload is decoded straight into typed structs and every other
+field (repository URLs, sender, organization, ...) is skipped by the parser
+without ever being materialized; otherwise the fast `json_backend` decoder is
+used and the fields are picked out of the resulting dict.
+"""
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from json_backend import loads
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+# Events and actions the bot has handlers for, for validating the routing table
+HANDLED_ACTIONS = {"issues": frozenset({"opened"})}
+
+# GitHub serializes "action" as the first key of the payload: {"action":"opened",...
+_ACTION_PROBE = re.compile(rb'\s*\{\s*"action"\s*:\s*"([^"\\]{1,64})"')
+
+
+def parse_routes(spec: str) -> Dict[str, Optional[FrozenSet[str]]]:
+    """Parse a routing table such as `issues:opened`.
+
+    Returns {event: allowed actions}; an event listed without actions routes
+    every action the bot handles. Actions without a handler are rejected, since
+    the handler would treat them as newly opened issues.
+    """
+    routes: Dict[str, set] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, action = entry.partition(":")
+        event, action = event.strip(), action.strip()
+        if event not in HANDLED_ACTIONS:
+            raise ValueError(f"Unsupported webhook event in routing table: {event!r}")
+        if not action:
+            routes.setdefault(event, set()).update(HANDLED_ACTIONS[event])
+        elif action in HANDLED_ACTIONS[event]:
+            routes.setdefault(event, set()).add(action)
+        else:
+            raise ValueError(f"Unsupported webhook action in routing table: {event}:{action}")
+    return {event: frozenset(actions) for event, actions in routes.items()}
+
+
+def probe_action(body: bytes) -> Optional[str]:
+    """Read the action from the start of the raw payload without decoding it; None if not found."""
+    match = _ACTION_PROBE.match(body, 0, 128)
+    return match.group(1).decode("utf-8") if match else None
+
+
+class EventRouter:
+    """Decides from the event header and a byte-level action probe which deliveries to decode.
+
+    Everything else is acknowledged untouched and counted per event (and action).
+    """
+
+    def __init__(self, routes: Dict[str, Optional[FrozenSet[str]]]):
+        self.routes = routes
+        self.skipped: Counter = Counter()
+        self.routed = 0
+        self.probe_misses = 0
+
+    def prefilter(self, event: Optional[str], body: bytes) -> bool:
+        """True if the delivery may be subscribed and is worth decoding."""
+        if event not in self.routes:
+            self.skipped[event or "unknown"] += 1
+            return False
+        action = probe_action(body)
+        if action is None:
+            # Unusual layout; let the decoder find the action
+            self.probe_misses += 1
+            return True
+        if not self._allowed(event, action):
+            self.skipped[f"{event}.{action}"] += 1
+            return False
+        return True
+
+    def accepts(self, event: str, action: Optional[str]) -> bool:
+        """Check the decoded action of a prefiltered delivery against the routing table."""
+        if self._allowed(event, action):
+            self.routed += 1
+            return True
+        self.skipped[f"{event}.{action}"] += 1
+        return False
+
+    def _allowed(self, event: str, action: Optional[str]) -> bool:
+        actions = self.routes.get(event, frozenset())
+        return actions is None or action in actions
+
+    def stats(self) -> Dict:
+        """Counters for the metrics endpoint."""
+        return {
+            "routes": {event: sorted(actions) if actions is not None else "*" for event, actions in self.routes.items()},
+            "routed": self.routed,
+            "probe_misses": self.probe_misses,
+            "skipped": dict(self.skipped),
+        }
+
+
+class IssueOpenedEvent:
+    """The fields of an `issues.opened` delivery the bot needs."""
+
+    __slots__ = (
+        "installation_id", "owner", "repo", "full_name", "number", "title", "body",
+        "user_login", "user_avatar", "html_url", "created_at", "labels",
+    )
+
+    def __init__(self, installation_id: int, owner: str, repo: str, full_name: str, number: int,
+                 title: Optional[str], body: Optional[str], user_login: Optional[str],
+                 user_avatar: Optional[str], html_url: Optional[str], created_at: Optional[str],
+                 labels: Tuple[str, ...]):
+        self.installation_id = installation_id
+        self.owner = owner
+        self.repo = repo
+        self.full_name = full_name
+        self.number = number
+        self.title = title
+        self.body = body
+        self.user_login = user_login
+        self.user_avatar = user_avatar
+        self.html_url = html_url
+        self.created_at = created_at
+        self.labels = labels
+
+    def __repr__(self) -> str:
+        return f"IssueOpenedEvent({self.full_name}#{self.number})"
+
+
+def _split_full_name(owner: Optional[str], repo: Optional[str], full_name: str) -> Tuple[str, str]:
+    if owner and repo:
+        return owner, repo
+    owner, _, repo = full_name.partition("/")
+    return owner, repo
+
+
+if msgspec is not None:
+    class _User(msgspec.Struct):
+        login: Optional[str] = None
+        avatar_url: Optional[str] = None
+
+    class _Label(msgspec.Struct):
+        name: Optional[str] = None
+
+    class _Issue(msgspec.Struct):
+        number: int
+        title: Optional[str] = None
+        body: Optional[str] = None
+        user: Optional[_User] = None
+        html_url: Optional[str] = None
+        created_at: Optional[str] = None
+        labels: List[_Label] = []
+
+    class _Owner(msgspec.Struct):
+        login: Optional[str] = None
+
+    class _Repository(msgspec.Struct):
+        full_name: str
+        name: Optional[str] = None
+        owner: Optional[_Owner] = None
+
+    class _Installation(msgspec.Struct):
+        id: int
+
+    class _IssuesPayload(msgspec.Struct):
+        action: Optional[str] = None
+        issue: Optional[_Issue] = None
+        repository: Optional[_Repository] = None
+        installation: Optional[_Installation] = None
+
+    _issues_decoder = msgspec.json.Decoder(_IssuesPayload)
+
+    def decode_issues_event(body: bytes) -> Tuple[Optional[str], Optional[IssueOpenedEvent]]:
+        """Decode an `issues` delivery into (action, event); event is None if required data is missing."""
+        payload = _issues_decoder.decode(body)
+        issue, repository, installation = payload.issue, payload.repository, payload.installation
+        if issue is None or repository is None or installation is None:
+            return payload.action, None
+        owner, repo = _split_full_name(
+            repository.owner.login if repository.owner else None, repository.name, repository.full_name
+        )
+        user = issue.user or _User()
+        return payload.action, IssueOpenedEvent(
+            installation.id, owner, repo, repository.full_name, issue.number, issue.title, issue.body,
+            user.login, user.avatar_url, issue.html_url, issue.created_at,
+            tuple(label.name for label in issue.labels),
+        )
+
+else:
+    def decode_issues_event(body: bytes) -> Tuple[Optional[str], Optional[IssueOpenedEvent]]:
+        """Decode an `issues` delivery into (action, event); event is None if required data is missing."""
+        payload = loads(body)
+        issue = payload.get("issue")
+        repository = payload.get("repository")
+        installation = payload.get("installation")
+        if not all([issue, repository, installation]):
+            return payload.get("action"), None
+        full_name = repository.get("full_name")
+        owner, repo = _split_full_name((repository.get("owner") or {}).get("login"), repository.get("name"), full_name)
+        user = issue.get("user") or {}
+        return payload.get("action"), IssueOpenedEvent(
+            installation.get("id"), owner, repo, full_name, issue.get("number"), issue.get("title"),
+            issue.get("body"), user.get("login"), user.get("avatar_url"), issue.get("html_url"),
+            issue.get("created_at"), tuple(label.get("name") for label in issue.get("labels") or ()),
+        )
@@ -0,0 +1,107 @@
+"""In-process work queue for webhook events acknowledged before they are processed."""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Processes one queued item; exceptions are logged and counted, never propagated
+JobHandler = Callable[[Any], Awaitable[Any]]
+
+
+class WebhookQueue:
+    """Bounded asyncio queue drained by a fixed pool of worker tasks."""
+
+    def __init__(self, handler: JobHandler, workers: int = 4, maxsize: int = 10000):
+        self._handler = handler
+        self.worker_count = max(1, workers)
+        self._queue: "asyncio.Queue" = asyncio.Queue(maxsize=maxsize)
+        self._workers: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._recent_waits: deque = deque(maxlen=1024)
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Spawn the worker pool."""
+        if self._workers:
+            return
+        self._started_at = time.monotonic()
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.worker_count)]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Give queued jobs up to `drain_timeout` seconds to finish, then stop the workers."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Stopping webhook workers with {self._queue.qsize()} jobs still queued")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, item: Any) -> bool:
+        """Enqueue a job without waiting; returns False when the queue is full."""
+        try:
+            self._queue.put_nowait((time.monotonic(), item))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def put(self, item: Any) -> None:
+        """Enqueue a job, waiting for space if the queue is full."""
+        await self._queue.put((time.monotonic(), item))
+        self.enqueued += 1
+
+    async def _work(self) -> None:
+        while True:
+            enqueued_at, item = await self._queue.get()
+            started = time.monotonic()
+            wait = started - enqueued_at
+            self._recent_waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+            self._busy += 1
+            try:
+                await self._handler(item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"Error processing queued webhook: {str(e)}")
+            finally:
+                self._busy -= 1
+                self._busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and worker utilization for the metrics endpoint."""
+        waits = sorted(self._recent_waits)
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        capacity = uptime * self.worker_count
+        return {
+            "depth": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "workers": self.worker_count if self._workers else 0,
+            "busy_workers": self._busy,
+            "utilization": round(self._busy_seconds / capacity, 4) if capacity else 0.0,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+            "wait_ms_p95": round(waits[int(len(waits) * 0.95) - 1] * 1000, 3) if waits else 0.0,
+            "wait_ms_max": round(self.max_wait * 1000, 3),
+        }